@@ -0,0 +1,253 @@
+"""
+Writes a synthetic season in the `LocalBackend` layout so the dashboard can run
+with no network, e.g. for profiling or load tests on a CI box.
+
+Usage:
+    python benchmarks/make_local_data.py data/
+    DASHBOARD_BACKEND=local DASHBOARD_DATA_DIR=data/ streamlit run streamlit_app.py
+"""
+
+import json
+import os
+import random
+import sys
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+TEAMS = [
+	"Arsenal",
+	"Aston Villa",
+	"Bournemouth",
+	"Brentford",
+	"Brighton",
+	"Burnley",
+	"Chelsea",
+	"Crystal Palace",
+	"Everton",
+	"Fulham",
+	"Liverpool",
+	"Luton",
+	"Manchester City",
+	"Manchester United",
+	"Newcastle",
+	"Nottingham Forest",
+	"Sheffield Utd",
+	"Tottenham",
+	"West Ham",
+	"Wolves",
+]
+POSITIONS = ["Goalkeeper", "Defender", "Midfielder", "Attacker"]
+ROUNDS = 30
+SEASON_START = datetime(2023, 8, 11, 19, 0)
+NEW_YORK = ZoneInfo("America/New_York")
+
+
+def logo(team_id: int) -> str:
+	return f"https://media.api-sports.io/football/teams/{team_id}.png"
+
+
+def write(data_dir: str, dataset: str, table: str, df: pd.DataFrame) -> None:
+	os.makedirs(os.path.join(data_dir, dataset), exist_ok=True)
+	df.to_parquet(os.path.join(data_dir, dataset, f"{table}.parquet"), index=False)
+
+
+def make_season(data_dir: str, seed: int = 39) -> None:
+	rng = random.Random(seed)
+	team_ids = {team: 33 + index for index, team in enumerate(TEAMS)}
+
+	forms = {team: "".join(rng.choice("WDL") for _ in range(ROUNDS)) for team in TEAMS}
+	points = {team: sum({"W": 3, "D": 1, "L": 0}[result] for result in form) for team, form in forms.items()}
+	ranked = sorted(TEAMS, key=lambda team: points[team], reverse=True)
+
+	standings = []
+	for rank, team in enumerate(ranked, start=1):
+		form = forms[team]
+		goals_for, goals_against = rng.randint(20, 80), rng.randint(20, 70)
+		standings.append(
+			{
+				"team_id": team_ids[team],
+				"rank": rank,
+				"team": team,
+				"games_played": ROUNDS,
+				"wins": form.count("W"),
+				"draws": form.count("D"),
+				"loses": form.count("L"),
+				"recent_form": form[-5:],
+				"points": points[team],
+				"goals_for": goals_for,
+				"goals_against": goals_against,
+				"goal_difference": goals_for - goals_against,
+			}
+		)
+	write(data_dir, "premier_league_dataset", "standings", pd.DataFrame(standings))
+
+	teams = [
+		{
+			"team_id": team_ids[team],
+			"team": team,
+			"logo": logo(team_ids[team]),
+			"form": forms[team],
+			"clean_sheets": rng.randint(0, 15),
+			"penalties_scored": rng.randint(0, 10),
+			"penalties_missed": rng.randint(0, 4),
+			"average_goals": round(rng.uniform(0.8, 2.6), 1),
+			"win_streak": rng.randint(1, 8),
+		}
+		for team in TEAMS
+	]
+	write(data_dir, "premier_league_dataset", "teams", pd.DataFrame(teams))
+
+	stadiums = [
+		{
+			"team": team,
+			"stadium": f"{team} Stadium",
+			"latitude": round(rng.uniform(50.7, 54.0), 6),
+			"longitude": round(rng.uniform(-3.0, 0.3), 6),
+			"capacity": str(rng.randint(11_000, 75_000)),
+			"year_opened": str(rng.randint(1880, 2016)),
+		}
+		for team in TEAMS
+	]
+	write(data_dir, "premier_league_dataset", "stadiums", pd.DataFrame(stadiums))
+
+	top_scorers = pd.DataFrame(
+		[
+			{
+				"name": f"Player {index}",
+				"goals": 20 - index * 2,
+				"team": rng.choice(TEAMS),
+				"assists": rng.randint(0, 10),
+				"nationality": "England",
+				"photo": f"https://media.api-sports.io/football/players/{index}.png",
+			}
+			for index in range(5)
+		]
+	)
+	write(data_dir, "premier_league_dataset", "top_scorers", top_scorers)
+
+	news = pd.DataFrame(
+		[
+			{
+				"title": f"Premier League story {index}",
+				"url": f"https://example.com/news/{index}",
+				"url_to_image": f"https://example.com/news/{index}.jpg",
+				"published_at": f"{12 - index:02d}:00:00",
+			}
+			for index in range(6)
+		]
+	)
+	write(data_dir, "premier_league_dataset", "news", news)
+
+	highlights = pd.DataFrame(
+		[
+			{
+				"video_id": f"video{index}",
+				"video_url": f"https://www.youtube.com/watch?v=video{index}",
+				"title": f"Highlights {index}",
+				"thumbnail": f"https://example.com/highlights/{index}.jpg",
+				"description": "",
+				"publish_time": SEASON_START + timedelta(days=7 * ROUNDS - index),
+			}
+			for index in range(6)
+		]
+	)
+	write(data_dir, "premier_league_dataset", "highlights", highlights)
+
+	current_round = pd.DataFrame({"season": ["Regular Season"] * ROUNDS, "round": range(1, ROUNDS + 1)})
+	write(data_dir, "premier_league_dataset", "current_round", current_round)
+
+	squads, injuries = [], []
+	for team in TEAMS:
+		for number in range(1, 26):
+			player_id = team_ids[team] * 100 + number
+			squads.append(
+				{
+					"team_id": team_ids[team],
+					"team_name": team,
+					"player_id": player_id,
+					"player_photo": f"https://media.api-sports.io/football/players/{player_id}.png",
+					"player_name": f"{team} Player {number}",
+					"player_age": rng.randint(17, 36),
+					"player_number": number,
+					"player_position": POSITIONS[min(number // 7, 3)],
+				}
+			)
+			if rng.random() < 0.05:
+				injuries.append(
+					{
+						"team_id": team_ids[team],
+						"team_name": team,
+						"player_id": player_id,
+						"player_name": f"{team} Player {number}",
+						"injury_type": "Missing Fixture",
+						"injury_reason": "Knee Injury",
+						"injury_date": (SEASON_START + timedelta(days=7 * ROUNDS)).date(),
+					}
+				)
+	write(data_dir, "premier_league_squads", "all_teams_squads_view", pd.DataFrame(squads))
+	write(data_dir, "premier_league_injuries", "all_teams_injuries_view", pd.DataFrame(injuries))
+
+	# The dashboard charts the previous New York day's quotes, so they are dated relative to today.
+	trading_day = datetime.combine(datetime.now(NEW_YORK).date() - timedelta(days=1), time(9, 30))
+	stocks = pd.DataFrame(
+		[
+			{
+				"symbol": "MANU",
+				"timestamp": int((trading_day + timedelta(minutes=minute)).replace(tzinfo=NEW_YORK).timestamp()),
+				"new_york_date": trading_day.date(),
+				"formatted_time": (trading_day + timedelta(minutes=minute)).strftime("%H:%M:%S"),
+				"new_york_time": trading_day + timedelta(minutes=minute),
+				"price": round(16 + rng.gauss(0, 0.2), 2),
+			}
+			for minute in range(0, 390, 30)
+		]
+	)
+	write(data_dir, "dbt_production", "stocks", stocks)
+
+	# A year of minute quotes up to the same trading day, rolled up like the dbt `stocks_ohlc_*` models.
+	sessions = pd.bdate_range(end=trading_day.date(), periods=252)
+	minutes = (
+		sessions.values[:, None]
+		+ pd.Timedelta(hours=9, minutes=30)
+		+ pd.timedelta_range(0, periods=390, freq="min").values
+	).ravel()
+	quotes = pd.Series(
+		16 + pd.Series(rng.gauss(0, 0.02) for _ in range(len(minutes))).cumsum().to_numpy(), index=minutes
+	)
+	for rollup, frequency in {"1m": "min", "5m": "5min", "30m": "30min", "daily": "D"}.items():
+		candles = quotes.resample(frequency).ohlc().dropna().round(2).rename_axis("bucket_start").reset_index()
+		write(data_dir, "dbt_production", f"stocks_ohlc_{rollup}", candles.assign(symbol="MANU"))
+
+	os.makedirs(os.path.join(data_dir, "fixtures"), exist_ok=True)
+	for round_number in range(1, ROUNDS + 1):
+		shuffled = rng.sample(TEAMS, len(TEAMS))
+		documents = []
+		for match in range(10):
+			home, away = shuffled[2 * match], shuffled[2 * match + 1]
+			kickoff = SEASON_START + timedelta(days=7 * (round_number - 1), hours=match % 3 * 2)
+			documents.append(
+				{
+					"id": f"{away} vs {home}",
+					"data": {
+						"date": kickoff.strftime("%Y-%m-%dT%H:%M:%S+00:00"),
+						"teams": {
+							"home": {"id": team_ids[home], "name": home, "logo": logo(team_ids[home])},
+							"away": {"id": team_ids[away], "name": away, "logo": logo(team_ids[away])},
+						},
+						"goals": {"home": rng.randint(0, 4), "away": rng.randint(0, 4)},
+						"status": "FT",
+					},
+				}
+			)
+		with open(os.path.join(data_dir, "fixtures", f"Regular Season - {round_number}.json"), "w") as file:
+			json.dump(documents, file)
+
+
+if __name__ == "__main__":
+	if len(sys.argv) != 2:
+		sys.exit("usage: python benchmarks/make_local_data.py <data_dir>")
+
+	make_season(sys.argv[1])
+	print(f"Synthetic season written to {sys.argv[1]}!")
@@ -0,0 +1,106 @@
+"""
+Compares the two backend result paths on the squads view: one Python dict
+per row fed into `pd.DataFrame`, against Arrow record batches converted straight
+into a columnar DataFrame.
+
+Usage:
+    python benchmarks/run_query_squads.py              # against BigQuery
+    python benchmarks/run_query_squads.py --offline    # synthetic squads-shaped data
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Tuple
+
+import pandas as pd
+import pyarrow as pa  # type: ignore
+from google.cloud.bigquery.table import Row
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def measure(load: Callable[[], pd.DataFrame], repeat: int) -> Tuple[float, float, pd.DataFrame]:
+	"""Returns the median wall time in seconds and the peak traced memory in MiB."""
+
+	timings = []
+	peak = 0
+	for _ in range(repeat):
+		tracemalloc.start()
+		start = time.perf_counter()
+		frame = load()
+		timings.append(time.perf_counter() - start)
+		peak = max(peak, tracemalloc.get_traced_memory()[1])
+		tracemalloc.stop()
+
+	return statistics.median(timings), peak / 2**20, frame
+
+
+def synthetic_squads(rows: int) -> pa.Table:
+	positions = ["Goalkeeper", "Defender", "Midfielder", "Attacker"]
+	return pa.table(
+		{
+			"team_id": pa.array([33 + i % 20 for i in range(rows)], pa.int64()),
+			"team_name": [f"Team {i % 20}" for i in range(rows)],
+			"player_id": pa.array(range(rows), pa.int64()),
+			"player_photo": [f"https://media.api-sports.io/football/players/{i}.png" for i in range(rows)],
+			"player_name": [f"Player {i}" for i in range(rows)],
+			"player_age": pa.array([None if i % 50 == 0 else 18 + i % 20 for i in range(rows)], pa.int64()),
+			"player_number": pa.array([None if i % 7 == 0 else i % 99 for i in range(rows)], pa.int64()),
+			"player_position": [positions[i % 4] for i in range(rows)],
+		}
+	)
+
+
+def offline_loaders(rows: int) -> Tuple[Callable[[], pd.DataFrame], Callable[[], pd.DataFrame]]:
+	table = synthetic_squads(rows)
+
+	# The REST path hands back one `Row` per record, which the row path turns into a dict.
+	field_to_index = {name: index for index, name in enumerate(table.column_names)}
+	bigquery_rows = [Row(tuple(record.values()), field_to_index) for record in table.to_pylist()]
+
+	def row_path() -> pd.DataFrame:
+		return pd.DataFrame(data=[dict(row) for row in bigquery_rows])
+
+	def arrow_path() -> pd.DataFrame:
+		return table.to_pandas(types_mapper={pa.int64(): pd.Int64Dtype()}.get)
+
+	return row_path, arrow_path
+
+
+def bigquery_loaders() -> Tuple[Callable[[], pd.DataFrame], Callable[[], pd.DataFrame]]:
+	from components.backends import BigQueryBackend
+	from components.connections import DASHBOARD_QUERIES
+
+	backend = BigQueryBackend()
+	query = DASHBOARD_QUERIES["squads"]
+
+	def row_path() -> pd.DataFrame:
+		return pd.DataFrame(data=backend.rows(query))
+
+	def arrow_path() -> pd.DataFrame:
+		return backend.query(query)
+
+	return row_path, arrow_path
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument("--offline", action="store_true", help="use synthetic data instead of BigQuery")
+	parser.add_argument("--rows", type=int, default=100_000, help="synthetic row count (offline only)")
+	parser.add_argument("--repeat", type=int, default=5)
+	args = parser.parse_args()
+
+	row_path, arrow_path = offline_loaders(args.rows) if args.offline else bigquery_loaders()
+
+	for label, load in (("list of dicts", row_path), ("arrow", arrow_path)):
+		seconds, mebibytes, frame = measure(load, args.repeat)
+		print(f"{label:>13}: {seconds * 1000:8.1f} ms  peak {mebibytes:7.1f} MiB  {len(frame)} rows")
+		print(f"{'':>15}{dict(frame.dtypes.astype(str))}")
+
+
+if __name__ == "__main__":
+	main()
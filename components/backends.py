@@ -0,0 +1,229 @@
+"""
+Data backends for the dashboard. `BigQueryBackend` reads from BigQuery and Firestore;
+`LocalBackend` runs the same SQL with DuckDB over Parquet exports of the same tables,
+so the dashboard can be profiled and load-tested with no network.
+
+To export the live tables into the local layout:
+    python -m components.backends export data/
+"""
+
+import glob
+import json
+import os
+import re
+import sys
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import firebase_admin  # type: ignore
+import pandas as pd
+import pyarrow as pa  # type: ignore
+from firebase_admin import firestore  # type: ignore
+from google.cloud import bigquery
+
+from shared.clients import get_bigquery_client, get_bigquery_storage_client, get_credentials
+
+MANIFEST_COLLECTION = "dashboard"
+MANIFEST_DOCUMENT = "manifest"
+
+# Matches the `dataset.table` references in the dashboard's queries.
+TABLE_REFERENCE = re.compile(r"(?:FROM|JOIN)\s+`?(\w+)\.(\w+)`?", re.IGNORECASE)
+
+# Named query parameters are written BigQuery style, e.g. `WHERE team_name = @team`.
+QUERY_PARAMETER = re.compile(r"@(\w+)")
+QUERY_PARAMETER_TYPES = {bool: "BOOL", int: "INT64", float: "FLOAT64", str: "STRING", datetime: "DATETIME"}
+
+
+class DashboardBackend(ABC):
+	"""Where the dashboard reads its datasets, the data version manifest and the fixtures from."""
+
+	def connect(self) -> None:
+		"""Opens any connections up front so the first query doesn't pay for them."""
+
+	@abstractmethod
+	def query(self, sql: str, params: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+		pass
+
+	def rows(self, sql: str) -> list:
+		return self.query(sql).to_dict("records")
+
+	def run_script(self, queries: Dict[str, str]) -> Dict[str, pd.DataFrame]:
+		return {name: self.query(sql) for name, sql in queries.items()}
+
+	@abstractmethod
+	def manifest(self) -> Dict[str, str]:
+		"""Returns the content hash of every table the ETL loaders have recorded."""
+
+	@abstractmethod
+	def fixtures(self, round_number: int) -> List[dict]:
+		"""Returns a round's fixtures as `{"id": ..., "data": ...}` documents in kickoff order."""
+
+
+class BigQueryBackend(DashboardBackend):
+	def __init__(self):
+		self._firestore_database: Optional[firestore.Client] = None
+		self._lock = threading.Lock()
+
+	@property
+	def firestore_database(self) -> firestore.Client:
+		with self._lock:
+			if self._firestore_database is None:
+				credentials, project = get_credentials()
+				if not firebase_admin._apps:
+					firebase_admin.initialize_app()
+				self._firestore_database = firestore.Client(credentials=credentials)
+
+		return self._firestore_database
+
+	def connect(self) -> None:
+		self.firestore_database
+
+	def rows(self, sql: str) -> list:
+		query_job = get_bigquery_client().query(sql)
+		raw_data = query_job.result()
+		data = [dict(data) for data in raw_data]
+		return data
+
+	def query(self, sql: str, params: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+		"""Downloads a result as Arrow record batches, through the Storage Read API when it spans several pages."""
+
+		job_config = bigquery.QueryJobConfig(
+			query_parameters=[
+				bigquery.ScalarQueryParameter(name, QUERY_PARAMETER_TYPES[type(value)], value)
+				for name, value in (params or {}).items()
+			]
+		)
+		query_job = get_bigquery_client().query(sql, job_config=job_config)
+		return query_job.result().to_dataframe(bqstorage_client=get_bigquery_storage_client())
+
+	def run_script(self, queries: Dict[str, str]) -> Dict[str, pd.DataFrame]:
+		"""Runs every query as a single multi-statement BigQuery job and returns one DataFrame per query."""
+
+		# Joining the statements into one script while remembering the line each statement starts on.
+		statements = [query.strip().rstrip(";") + ";" for query in queries.values()]
+		start_lines = {}
+		line = 1
+		for name, statement in zip(queries, statements):
+			start_lines[line] = name
+			line += statement.count("\n") + 1
+		script = "\n".join(statements)
+
+		client = get_bigquery_client()
+		parent_job = client.query(script)
+		parent_job.result()
+
+		# Each SELECT in the script runs as a child job, matched back to its query by the line it started on.
+		frames = {}
+		for child_job in client.list_jobs(parent_job=parent_job):
+			start_line = child_job.script_statistics.stack_frames[0].start_line
+			frames[start_lines[start_line]] = child_job.result().to_dataframe(
+				bqstorage_client=get_bigquery_storage_client()
+			)
+
+		return frames
+
+	def manifest(self) -> Dict[str, str]:
+		document = self.firestore_database.collection(MANIFEST_COLLECTION).document(MANIFEST_DOCUMENT).get()
+		manifest = document.to_dict() or {}
+		return {table: entry["content_hash"] for table, entry in manifest.items()}
+
+	def fixtures(self, round_number: int) -> List[dict]:
+		# Calling each document in the collection in ascending order by date.
+		collection_ref = self.firestore_database.collection(f"Regular Season - {round_number}")
+		query = collection_ref.order_by("date", direction=firestore.Query.ASCENDING)
+		return [{"id": doc.id, "data": doc.to_dict()} for doc in query.stream()]
+
+
+class LocalBackend(DashboardBackend):
+	"""
+	Reads Parquet files laid out as `<data_dir>/<dataset>/<table>.parquet`, fixtures from
+	`<data_dir>/fixtures/Regular Season - <round>.json` and the manifest from `<data_dir>/manifest.json`.
+	"""
+
+	def __init__(self, data_dir: str):
+		self.data_dir = data_dir
+		self._connection = None
+		self._lock = threading.Lock()
+
+	def connect(self) -> None:
+		import duckdb  # type: ignore
+
+		with self._lock:
+			if self._connection is not None:
+				return
+
+			connection = duckdb.connect()
+			for path in sorted(glob.glob(os.path.join(self.data_dir, "*", "*.parquet"))):
+				dataset = os.path.basename(os.path.dirname(path))
+				table = os.path.splitext(os.path.basename(path))[0]
+				view = f'"{dataset}"."{table}"'
+				connection.execute(f'CREATE SCHEMA IF NOT EXISTS "{dataset}"')
+				connection.execute(f"CREATE OR REPLACE VIEW {view} AS SELECT * FROM read_parquet('{path}')")
+			self._connection = connection
+
+	@staticmethod
+	def translate(sql: str) -> str:
+		# BigQuery quotes `dataset.table` with backticks; DuckDB resolves the bare name to schema.table.
+		# BigQuery names parameters `@name`, DuckDB `$name`.
+		return QUERY_PARAMETER.sub(r"$\1", sql.replace("`", ""))
+
+	def query(self, sql: str, params: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+		self.connect()
+		# Each query gets its own cursor so the prefetch threads can share the database.
+		table = self._connection.cursor().execute(self.translate(sql), params).arrow()  # type: ignore
+		return table.to_pandas(types_mapper={pa.int64(): pd.Int64Dtype(), pa.bool_(): pd.BooleanDtype()}.get)
+
+	def manifest(self) -> Dict[str, str]:
+		path = os.path.join(self.data_dir, "manifest.json")
+		if not os.path.exists(path):
+			return {}
+
+		with open(path) as file:
+			manifest = json.load(file)
+		return {table: entry["content_hash"] for table, entry in manifest.items()}
+
+	def fixtures(self, round_number: int) -> List[dict]:
+		with open(os.path.join(self.data_dir, "fixtures", f"Regular Season - {round_number}.json")) as file:
+			documents = json.load(file)
+		return sorted(documents, key=lambda document: document["data"]["date"])
+
+
+def export_local_data(backend: BigQueryBackend, queries: Dict[str, str], data_dir: str, rounds: range) -> None:
+	"""Copies every table the queries read, plus the fixtures for `rounds`, into the `LocalBackend` layout."""
+
+	tables = sorted({match.groups() for query in queries.values() for match in TABLE_REFERENCE.finditer(query)})
+	for dataset, table in tables:
+		os.makedirs(os.path.join(data_dir, dataset), exist_ok=True)
+		frame = backend.query(f"SELECT * FROM `{dataset}.{table}`")
+		frame.to_parquet(os.path.join(data_dir, dataset, f"{table}.parquet"), index=False)
+		print(f"Exported {dataset}.{table}!")
+
+	os.makedirs(os.path.join(data_dir, "fixtures"), exist_ok=True)
+	for round_number in rounds:
+		with open(os.path.join(data_dir, "fixtures", f"Regular Season - {round_number}.json"), "w") as file:
+			json.dump(backend.fixtures(round_number), file, default=str)
+	print(f"Exported {len(rounds)} rounds of fixtures!")
+
+
+if __name__ == "__main__":
+	from components.connections import DASHBOARD_QUERIES, STOCK_ROLLUP_QUERY, STOCK_ROLLUPS, TEAM_SQUAD_QUERY
+
+	if len(sys.argv) != 3 or sys.argv[1] != "export":
+		sys.exit("usage: python -m components.backends export <data_dir>")
+
+	bigquery_backend = BigQueryBackend()
+	round_range = bigquery_backend.query(DASHBOARD_QUERIES["rounds"])
+	# The squad and stock rollup queries are run on demand, outside the dashboard's datasets.
+	export_queries = {
+		**DASHBOARD_QUERIES,
+		"team_squad": TEAM_SQUAD_QUERY,
+		**{f"stocks_ohlc_{rollup}": STOCK_ROLLUP_QUERY.format(rollup=rollup) for rollup in STOCK_ROLLUPS},
+	}
+	export_local_data(
+		bigquery_backend,
+		export_queries,
+		sys.argv[2],
+		range(int(round_range["min_round"][0]), int(round_range["max_round"][0]) + 1),
+	)
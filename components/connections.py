@@ -1,177 +1,508 @@
-import firebase_admin  # type: ignore
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
 import pandas as pd
 import streamlit as st
-from firebase_admin import firestore  # type: ignore
-from google.cloud import bigquery
-import google.auth
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from components.backends import BigQueryBackend, DashboardBackend, LocalBackend
+from components.fixtures_cache import SealedRoundCache
+from components.query_cache import QueryCache
+
+# "bigquery" reads from BigQuery and Firestore, "local" runs the same queries with DuckDB over Parquet files
+# in DASHBOARD_DATA_DIR.
+DASHBOARD_BACKEND = os.environ.get("DASHBOARD_BACKEND", "bigquery")
+DASHBOARD_DATA_DIR = os.environ.get("DASHBOARD_DATA_DIR", "data")
+
+# Prefetch settings. "concurrent" runs one BigQuery job per dataset in parallel, "script" runs a single
+# multi-statement job; BigQuery executes script statements one after another.
+SNAPSHOT_LOADER = os.environ.get("SNAPSHOT_LOADER", "concurrent")
+PREFETCH_MAX_WORKERS = int(os.environ.get("PREFETCH_MAX_WORKERS", "8"))
+PREFETCH_TIMEOUT = float(os.environ.get("PREFETCH_TIMEOUT", "30"))
+
+# With lazy tabs only the header and the first tab are loaded up front; every other tab loads its datasets
+# the first time it is opened.
+LAZY_TABS = os.environ.get("LAZY_TABS", "false").lower() == "true"
 
+# The ETL loaders record a content hash per table in a manifest. Datasets whose tables are not in the manifest
+# fall back to a flat TTL.
+MANIFEST_POLL_SECONDS = int(os.environ.get("MANIFEST_POLL_SECONDS", "15"))
+FALLBACK_TTL_SECONDS = 600
 
-# Firestore Connection
+# Query results are also kept on local disk so a restarted instance can serve its first session without BigQuery.
+QUERY_CACHE_DIR = os.environ.get("QUERY_CACHE_DIR", os.path.join(tempfile.gettempdir(), "premier-league-cache"))
+QUERY_CACHE_MAX_BYTES = int(os.environ.get("QUERY_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Fixtures of finished rounds never change, so they are kept for the rest of the season the ETL loads.
+FIXTURES_SEASON = "2023"
+FIXTURES_CACHE_DIR = os.path.join(QUERY_CACHE_DIR, "fixtures", FIXTURES_SEASON)
+
+# The stocks mart is partitioned by New York trading day.
+NEW_YORK = ZoneInfo("America/New_York")
+
+
+# Backend Connection
 @st.cache_resource
-def firestore_connection() -> firestore.Client:
-	credentials, project = google.auth.default()
-	if not firebase_admin._apps:
-		firebase_admin.initialize_app()
+def get_backend() -> DashboardBackend:
+	if DASHBOARD_BACKEND == "local":
+		return LocalBackend(DASHBOARD_DATA_DIR)
+	return BigQueryBackend()
+
 
-	return firestore.Client(credentials=credentials)
+# Data Versions
+@st.cache_data(ttl=MANIFEST_POLL_SECONDS, show_spinner=False)
+def get_manifest() -> Dict[str, str]:
+	return get_backend().manifest()
 
 
-# BigQuery Connection
-@st.cache_data(ttl=600)
-def run_query(query):
-	credentials, project = google.auth.default()
-	query_job = bigquery.Client(credentials=credentials).query(query)
-	raw_data = query_job.result()
-	data = [dict(data) for data in raw_data]
-	return data
+class FrameStore:
+	"""Process-wide store of dataset frames, each tagged with the data version it was loaded at."""
+
+	def __init__(self, fallback_ttl: float):
+		self.fallback_ttl = fallback_ttl
+		self._frames: Dict[str, Tuple[Optional[str], float, pd.DataFrame]] = {}
+		self._locks: Dict[str, threading.Lock] = {}
+		self._refreshing: Set[str] = set()
+		self._guard = threading.Lock()
+
+	def get(self, name: str, version: Optional[str]) -> Optional[pd.DataFrame]:
+		entry = self._frames.get(name)
+		if entry is None:
+			return None
+
+		loaded_version, loaded_at, frame = entry
+		if version is None:
+			is_fresh = time.monotonic() - loaded_at < self.fallback_ttl
+		else:
+			is_fresh = loaded_version == version
+
+		return frame if is_fresh else None
+
+	def put(self, name: str, version: Optional[str], frame: pd.DataFrame) -> None:
+		loaded_at = time.monotonic()
+		# Lets the render cache key a section's output without hashing the frame; untracked frames get a
+		# version per load.
+		frame.attrs["data_version"] = f"{name}:{version or loaded_at}"
+		self._frames[name] = (version, loaded_at, frame)
+
+	def lock(self, name: str) -> threading.Lock:
+		with self._guard:
+			return self._locks.setdefault(name, threading.Lock())
+
+	def begin_refresh(self, name: str) -> bool:
+		"""Claims the background refresh of a dataset, returning False if one is already running."""
+
+		with self._guard:
+			if name in self._refreshing:
+				return False
+			self._refreshing.add(name)
+			return True
+
+	def end_refresh(self, name: str) -> None:
+		with self._guard:
+			self._refreshing.discard(name)
 
 
 @st.cache_resource
-def get_standings() -> pd.DataFrame:
-	standings_data = run_query(
-		"""
-            SELECT rank, points, t.logo, t.team, games_played, wins, draws, loses, goals_for, goals_against, goal_difference
-            FROM `premier_league_dataset.standings` AS s
-			INNER JOIN `premier_league_dataset.teams` AS t
-			ON s.team_id = t.team_id
-			ORDER BY rank ASC;
-        """
-	)
-	return pd.DataFrame(data=standings_data)
+def frame_store() -> FrameStore:
+	return FrameStore(fallback_ttl=FALLBACK_TTL_SECONDS)
 
 
 @st.cache_resource
-def get_stadiums() -> pd.DataFrame:
-	stadiums_data = run_query(
-		"""
-            SELECT team, stadium, latitude, longitude
-            FROM `premier_league_dataset.stadiums`;
-        """
-	)
-	return pd.DataFrame(data=stadiums_data)
+def query_cache() -> QueryCache:
+	return QueryCache(QUERY_CACHE_DIR, max_bytes=QUERY_CACHE_MAX_BYTES)
 
 
 @st.cache_resource
-def get_teams() -> pd.DataFrame:
-	teams_data = run_query(
-		"""
-            SELECT t.logo, form, t.team, clean_sheets, penalties_scored, penalties_missed, average_goals, win_streak
+def sealed_rounds() -> SealedRoundCache:
+	return SealedRoundCache(FIXTURES_CACHE_DIR)
+
+
+# Every dataset the dashboard renders, keyed by the name used in `DashboardSnapshot`.
+DASHBOARD_QUERIES: Dict[str, str] = {
+	"standings": """
+            SELECT rank, points, t.logo, t.team, games_played, wins, draws, loses, goals_for, goals_against, goal_difference, s.team_id
+            FROM `premier_league_dataset.standings` AS s
+			INNER JOIN `premier_league_dataset.teams` AS t
+			ON s.team_id = t.team_id
+			ORDER BY rank ASC;
+        """,
+	"stadiums": """
+            SELECT team, stadium, latitude, longitude
+            FROM `premier_league_dataset.stadiums`;
+        """,
+	"teams": """
+            SELECT t.logo, form, t.team, clean_sheets, penalties_scored, penalties_missed, average_goals, win_streak, t.team_id
             FROM `premier_league_dataset.teams` AS t
             LEFT JOIN `premier_league_dataset.standings` AS s
             ON t.team = s.Team
             ORDER BY s.rank;
-        """
-	)
-	return pd.DataFrame(data=teams_data)
-
-
-@st.cache_resource
-def get_top_scorers() -> pd.DataFrame:
-	top_scorers_data = run_query(
-		"""
+        """,
+	"top_scorers": """
             SELECT *
             FROM `premier_league_dataset.top_scorers`
             ORDER BY Goals DESC;
-        """
-	)
-	return pd.DataFrame(data=top_scorers_data)
-
-
-@st.cache_resource
-def get_news() -> pd.DataFrame:
-	news_data = run_query(
-		"""
+        """,
+	"news": """
             SELECT *
             FROM `premier_league_dataset.news`
             ORDER BY published_at DESC;
-        """
-	)
-	return pd.DataFrame(data=news_data)
-
-
-@st.cache_resource
-def get_highlights() -> pd.DataFrame:
-	highlights_data = run_query(
-		"""
+        """,
+	"highlights": """
 			SELECT *
 			FROM `premier_league_dataset.highlights`
 			ORDER BY publish_time DESC;
-		"""
-	)
-	return pd.DataFrame(data=highlights_data)
-
-
-@st.cache_resource
-def get_league_statistics() -> pd.DataFrame:
-	league_statistics = run_query(
-		"""
-            SELECT 
+		""",
+	"league_statistics": """
+            SELECT
                 SUM(goals_for) AS league_goals_scored,
                 SUM(penalties_scored) AS league_penalties_scored,
-                SUM(clean_sheets) AS league_clean_sheets     
+                SUM(clean_sheets) AS league_clean_sheets
             FROM premier_league_dataset.teams AS t
             JOIN premier_league_dataset.standings AS s
             ON t.team_id = s.team_id;
-        """
-	)
-	return pd.DataFrame(data=league_statistics)
+        """,
+	"rounds": """
+            SELECT MIN(round) AS min_round, MAX(round) AS max_round
+            FROM `premier_league_dataset.current_round`;
+        """,
+	"squads": """
+			SELECT *
+			FROM `premier_league_squads.all_teams_squads_view`;
+		""",
+	"injuries": """
+			SELECT *
+			FROM `premier_league_injuries.all_teams_injuries_view`;
+		""",
+	"stocks": """
+        SELECT new_york_time, price
+        FROM `dbt_production.stocks`
+        WHERE new_york_date = DATE '{previous_day}' AND symbol = 'MANU'
+        ORDER BY new_york_time DESC;
+        """,
+}
 
 
-@st.cache_resource
-def get_min_round() -> int:
-	min_round_row = run_query(
-		"""
-            SELECT MIN(round) AS round
-            FROM `premier_league_dataset.current_round`;
-        """
-	)
-	min_round_df = pd.DataFrame(data=min_round_row)
-	min_round = min_round_df["round"][0]
-	return min_round
+def dataset_query(name: str) -> str:
+	"""Returns a dataset's query, with the stocks filtered on the previous New York day's partition."""
 
+	previous_day = datetime.now(NEW_YORK).date() - timedelta(days=1)
+	return DASHBOARD_QUERIES[name].replace("{previous_day}", previous_day.isoformat())
 
-@st.cache_resource
-def get_max_round() -> int:
-	max_round_row = run_query(
-		"""
-            SELECT MAX(round) AS round 
-            FROM `premier_league_dataset.current_round`;
-        """
-	)
-	max_round_row = pd.DataFrame(data=max_round_row)
-	max_round = max_round_row["round"][0]
-	return max_round
 
+# The tables behind each dataset, as named in the manifest.
+DATASET_SOURCES: Dict[str, Tuple[str, ...]] = {
+	"standings": ("standings", "teams"),
+	"stadiums": ("stadiums",),
+	"teams": ("teams", "standings"),
+	"top_scorers": ("top_scorers",),
+	"news": ("news",),
+	"highlights": ("highlights",),
+	"league_statistics": ("teams", "standings"),
+	"rounds": ("current_round",),
+	"squads": ("squads",),
+	"injuries": ("injuries",),
+	"stocks": ("stocks",),
+}
 
-@st.cache_resource
-def get_squads() -> pd.DataFrame:
-	squads_data = run_query(
-		"""
-			SELECT * 
+
+def dataset_version(name: str) -> Optional[str]:
+	"""Combines the manifest hashes of a dataset's tables, or returns None if any of them is untracked."""
+
+	manifest = get_manifest()
+	hashes = [manifest.get(table) for table in DATASET_SOURCES[name]]
+	if None in hashes:
+		return None
+
+	return "-".join(hashes)  # type: ignore
+
+
+# One team's squad, for the Squads tab; the full league is only loaded for the "all squads" view.
+TEAM_SQUAD_QUERY = """
+			SELECT *
 			FROM `premier_league_squads.all_teams_squads_view`
-			
+			WHERE team_name = @team;
 		"""
-	)
-	return pd.DataFrame(data=squads_data)
 
 
-@st.cache_resource
-def get_injuries() -> pd.DataFrame:
-	injuries_data = run_query(
-		"""
-			SELECT * 
-			FROM `premier_league_injuries.all_teams_injuries_view`
+@st.cache_data(ttl=FALLBACK_TTL_SECONDS, max_entries=64, show_spinner=False)
+def load_team_squad(team: str, version: Optional[str]) -> pd.DataFrame:
+	frame = get_backend().query(TEAM_SQUAD_QUERY, {"team": team})
+	frame.attrs["data_version"] = f"squads:{team}:{version or time.monotonic()}"
+	return frame
+
+
+def get_team_squad(team: str) -> pd.DataFrame:
+	"""Returns a team's squad, cached per team until the squads' data version changes."""
+
+	return load_team_squad(team, dataset_version("squads"))
+
+
+# OHLC rollups of the stock quotes, finest first, each with its bucket length.
+STOCK_ROLLUPS: Dict[str, timedelta] = {
+	"1m": timedelta(minutes=1),
+	"5m": timedelta(minutes=5),
+	"30m": timedelta(minutes=30),
+	"daily": timedelta(days=1),
+}
+STOCK_ROLLUP_QUERY = """
+			SELECT bucket_start, open, high, low, close
+			FROM `dbt_production.stocks_ohlc_{rollup}`
+			WHERE bucket_start >= @start AND symbol = @symbol
+			ORDER BY bucket_start;
 		"""
+
+
+@st.cache_data(ttl=FALLBACK_TTL_SECONDS, max_entries=32, show_spinner=False)
+def load_stock_rollup(rollup: str, start: datetime, version: Optional[str]) -> pd.DataFrame:
+	frame = get_backend().query(STOCK_ROLLUP_QUERY.format(rollup=rollup), {"start": start, "symbol": "MANU"})
+	frame.attrs["data_version"] = f"stocks:{rollup}:{start.isoformat()}:{version or time.monotonic()}"
+	return frame
+
+
+def get_stock_rollup(rollup: str, start: datetime) -> pd.DataFrame:
+	"""Returns a rollup's buckets from `start` on, cached until the stocks' data version changes."""
+
+	if rollup not in STOCK_ROLLUPS:
+		raise ValueError(f"Unknown stock rollup: {rollup}")
+
+	return load_stock_rollup(rollup, start, dataset_version("stocks"))
+
+
+def refresh_dataset(
+	backend: DashboardBackend, store: FrameStore, cache: QueryCache, name: str, version: Optional[str]
+) -> pd.DataFrame:
+	query = dataset_query(name)
+	frame = backend.query(query)
+	store.put(name, version, frame)
+	cache.put(query, version, frame)
+	return frame
+
+
+def load_from_disk(
+	backend: DashboardBackend, store: FrameStore, cache: QueryCache, name: str, version: Optional[str]
+) -> Optional[pd.DataFrame]:
+	"""Reads a dataset from the on-disk cache, refreshing untracked datasets in the background."""
+
+	query = dataset_query(name)
+	if version is not None:
+		return cache.get(query, version)
+
+	# Without a manifest entry the newest file on disk may be out of date, so it's served while a new copy loads.
+	frame = cache.latest(query)
+	if frame is not None and store.begin_refresh(name):
+
+		def refresh() -> None:
+			try:
+				refresh_dataset(backend, store, cache, name, version)
+			finally:
+				store.end_refresh(name)
+
+		threading.Thread(target=refresh, name=f"refresh-{name}", daemon=True).start()
+
+	return frame
+
+
+def load_dataset(name: str) -> pd.DataFrame:
+	"""Returns the cached frame for a dataset, re-querying it only when its data version has changed."""
+
+	store = frame_store()
+	version = dataset_version(name)
+	frame = store.get(name, version)
+	if frame is None:
+		backend = get_backend()
+		cache = query_cache()
+		with store.lock(name):
+			frame = store.get(name, version)
+			if frame is None:
+				frame = load_from_disk(backend, store, cache, name, version)
+				if frame is None:
+					frame = refresh_dataset(backend, store, cache, name, version)
+				else:
+					store.put(name, version, frame)
+
+	return frame
+
+
+def load_datasets_script(names: List[str]) -> Dict[str, pd.DataFrame]:
+	"""Loads the datasets, re-querying only the stale ones in a single multi-statement job."""
+
+	backend = get_backend()
+	store = frame_store()
+	cache = query_cache()
+	versions = {name: dataset_version(name) for name in names}
+	frames = {name: store.get(name, versions[name]) for name in names}
+	missing = [name for name, frame in frames.items() if frame is None]
+	for name in missing:
+		frame = load_from_disk(backend, store, cache, name, versions[name])
+		if frame is not None:
+			store.put(name, versions[name], frame)
+			frames[name] = frame
+
+	stale = {name: dataset_query(name) for name, frame in frames.items() if frame is None}
+	if stale:
+		for name, frame in backend.run_script(stale).items():
+			store.put(name, versions[name], frame)
+			cache.put(stale[name], versions[name], frame)
+			frames[name] = frame
+
+	return frames  # type: ignore
+
+
+def gather(futures: Dict[str, Future], timeout: float) -> Dict[str, object]:
+	"""
+	Waits for every future, giving each one at most `timeout` seconds from submission. The ones that
+	take longer or fail are left out of the results, so only the sections reading them go without.
+	"""
+
+	deadline = time.monotonic() + timeout
+	results = {}
+	for name, future in futures.items():
+		try:
+			results[name] = future.result(timeout=max(deadline - time.monotonic(), 0))
+		except FutureTimeoutError:
+			print(f"Loading '{name}' took longer than {timeout} seconds.")
+		except Exception as error:
+			print(f"Loading '{name}' failed: {error!r}")
+
+	return results
+
+
+def prefetch_datasets(
+	names: Iterable[str], max_workers: int = PREFETCH_MAX_WORKERS, timeout: float = PREFETCH_TIMEOUT
+) -> Tuple[DashboardBackend, Dict[str, pd.DataFrame]]:
+	"""
+	Submits the backend's connection setup and every stale dataset load to a bounded thread pool at once.
+	Datasets that fail or don't load within `timeout` are missing from the returned frames.
+	"""
+
+	backend = get_backend()
+	store = frame_store()
+	frames = {name: store.get(name, dataset_version(name)) for name in names}
+	missing = [name for name, frame in frames.items() if frame is None]
+	if not missing:
+		return backend, frames  # type: ignore
+
+	# Worker threads share this session's script context so the cached loaders behave as on the main thread.
+	executor = ThreadPoolExecutor(
+		max_workers=max_workers,
+		thread_name_prefix="prefetch",
+		initializer=add_script_run_ctx,
+		initargs=(None, get_script_run_ctx()),
 	)
-	return pd.DataFrame(data=injuries_data)
+	try:
+		futures = {"connect": executor.submit(backend.connect)}
+		if SNAPSHOT_LOADER == "script":
+			futures["script"] = executor.submit(load_datasets_script, missing)
+		else:
+			for name in missing:
+				futures[name] = executor.submit(load_dataset, name)
 
+		results = gather(futures, timeout)
+	finally:
+		executor.shutdown(wait=False, cancel_futures=True)
 
-@st.cache_resource
-def get_stocks() -> pd.DataFrame:
-	stock_data = run_query(
-		"""
-        SELECT new_york_time, price 
-        FROM `dbt_production.stocks` 
-        """
+	results.pop("connect", None)
+	frames.update(results.get("script", {}) if SNAPSHOT_LOADER == "script" else results)  # type: ignore
+
+	return backend, {name: frame for name, frame in frames.items() if frame is not None}
+
+
+@dataclass(frozen=True)
+class DashboardSnapshot:
+	"""Every dataset the dashboard renders up front; a dataset that didn't load in time is `None`."""
+
+	standings: Optional[pd.DataFrame]
+	stadiums: Optional[pd.DataFrame]
+	teams: Optional[pd.DataFrame]
+	top_scorers: Optional[pd.DataFrame]
+	news: Optional[pd.DataFrame]
+	highlights: Optional[pd.DataFrame]
+	league_statistics: Optional[pd.DataFrame]
+	injuries: Optional[pd.DataFrame]
+	stocks: Optional[pd.DataFrame]
+	min_round: Optional[int]
+	max_round: Optional[int]
+
+
+# The full league's squads are only loaded when asked for, so they are not part of the snapshot.
+SNAPSHOT_DATASETS = tuple(name for name in DASHBOARD_QUERIES if name != "squads")
+
+
+def build_snapshot(frames: Dict[str, pd.DataFrame]) -> DashboardSnapshot:
+	rounds = frames.get("rounds")
+
+	return DashboardSnapshot(
+		**{name: frames.get(name) for name in SNAPSHOT_DATASETS if name != "rounds"},
+		min_round=int(rounds["min_round"][0]) if rounds is not None else None,
+		max_round=int(rounds["max_round"][0]) if rounds is not None else None,
 	)
-	return pd.DataFrame(data=stock_data)
+
+
+def prefetch_dashboard(
+	max_workers: int = PREFETCH_MAX_WORKERS, timeout: float = PREFETCH_TIMEOUT
+) -> Tuple[DashboardBackend, DashboardSnapshot]:
+	backend, frames = prefetch_datasets(SNAPSHOT_DATASETS, max_workers, timeout)
+	return backend, build_snapshot(frames)
+
+
+def get_dashboard_snapshot() -> DashboardSnapshot:
+	return prefetch_dashboard()[1]
+
+
+def get_standings() -> Optional[pd.DataFrame]:
+	return get_dashboard_snapshot().standings
+
+
+def get_stadiums() -> Optional[pd.DataFrame]:
+	return get_dashboard_snapshot().stadiums
+
+
+def get_teams() -> Optional[pd.DataFrame]:
+	return get_dashboard_snapshot().teams
+
+
+def get_top_scorers() -> Optional[pd.DataFrame]:
+	return get_dashboard_snapshot().top_scorers
+
+
+def get_news() -> Optional[pd.DataFrame]:
+	return get_dashboard_snapshot().news
+
+
+def get_highlights() -> Optional[pd.DataFrame]:
+	return get_dashboard_snapshot().highlights
+
+
+def get_league_statistics() -> Optional[pd.DataFrame]:
+	return get_dashboard_snapshot().league_statistics
+
+
+def get_min_round() -> Optional[int]:
+	return get_dashboard_snapshot().min_round
+
+
+def get_max_round() -> Optional[int]:
+	return get_dashboard_snapshot().max_round
+
+
+def get_squads() -> Optional[pd.DataFrame]:
+	"""Returns every team's squad, loaded on its own rather than with the snapshot."""
+
+	return prefetch_datasets(("squads",))[1].get("squads")
+
+
+def get_injuries() -> Optional[pd.DataFrame]:
+	return get_dashboard_snapshot().injuries
+
+
+def get_stocks() -> Optional[pd.DataFrame]:
+	return get_dashboard_snapshot().stocks
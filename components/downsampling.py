@@ -0,0 +1,37 @@
+import numpy as np
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+	"""
+	Returns the indices of at most `threshold` points that keep the series' shape, picked with
+	Largest-Triangle-Three-Buckets: the first and last points, then from each bucket in between
+	the point forming the largest triangle with the previously picked point and the next bucket's mean.
+	"""
+
+	length = len(x)
+	if threshold >= length or threshold < 3:
+		return np.arange(length)
+
+	x = np.asarray(x, dtype=np.float64)
+	y = np.asarray(y, dtype=np.float64)
+
+	# The first and last points are kept as buckets of their own; the rest is split evenly.
+	edges = np.linspace(1, length - 1, threshold - 1).astype(np.int64)
+	picked = np.empty(threshold, dtype=np.int64)
+	picked[0], picked[-1] = 0, length - 1
+
+	previous = 0
+	for bucket in range(threshold - 2):
+		start, stop = edges[bucket], edges[bucket + 1]
+		next_stop = edges[bucket + 2] if bucket + 2 < len(edges) else length
+		mean_x = x[stop:next_stop].mean()
+		mean_y = y[stop:next_stop].mean()
+
+		areas = np.abs(
+			(x[previous] - mean_x) * (y[start:stop] - y[previous])
+			- (x[previous] - x[start:stop]) * (mean_y - y[previous])
+		)
+		previous = start + int(areas.argmax())
+		picked[bucket + 1] = previous
+
+	return picked
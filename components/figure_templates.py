@@ -0,0 +1,48 @@
+from typing import Any, Callable, Dict, List
+
+import altair as alt
+import pandas as pd
+import plotly.graph_objects as go
+
+from components.render_cache import render_cache
+
+
+class FigureTemplate:
+	"""A Plotly figure's layout and trace style, validated once, that each rerun patches new trace data into."""
+
+	def __init__(self, figure: go.Figure):
+		spec = figure.to_dict()
+		self.layout: Dict[str, Any] = spec["layout"]
+		self.traces: List[Dict[str, Any]] = spec["data"]
+
+	def patch(self, traces: List[Dict[str, Any]]) -> go.Figure:
+		# Every trace is laid over the template's first trace, which carries the style but no data.
+		style = self.traces[0] if self.traces else {}
+		data = [{**style, **trace} for trace in traces]
+		# The layout was validated when the template was built, so the new figure skips validation.
+		return go.Figure({"layout": self.layout, "data": data}, _validate=False)
+
+	def figure(self) -> go.Figure:
+		"""Returns the template as built, for figures whose traces only change with the data version."""
+
+		return go.Figure({"layout": self.layout, "data": self.traces}, _validate=False)
+
+
+def figure_template(section: str, frame: pd.DataFrame, build: Callable[[], go.Figure]) -> FigureTemplate:
+	"""Returns the section's Plotly template, building it once per data version of `frame`."""
+
+	return render_cache.get(f"{section}:figure", frame, lambda: FigureTemplate(build()))
+
+
+def vega_lite_spec(section: str, frame: pd.DataFrame, build: Callable[[], alt.Chart]) -> Dict[str, Any]:
+	"""Returns the section's Altair chart as a Vega-Lite spec without data, built once per data version of `frame`."""
+
+	def serialize() -> Dict[str, Any]:
+		# Streamlit renders Altair charts without the default theme's fixed width and height.
+		with alt.theme.enable("none"):
+			spec = build().to_dict()
+		spec.pop("data", None)
+		spec.pop("datasets", None)
+		return spec
+
+	return render_cache.get(f"{section}:spec", frame, serialize)
@@ -0,0 +1,75 @@
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+# Status codes the Football API gives a match that is over.
+FINISHED_STATUSES = {"FT", "AET", "PEN"}
+
+# Documents loaded before the status was recorded count as finished this long after kickoff.
+FINISHED_AFTER = timedelta(hours=3)
+
+
+def is_finished(fixture: dict, now: datetime) -> bool:
+	if fixture.get("status") is not None:
+		return fixture["status"] in FINISHED_STATUSES
+
+	kickoff = datetime.fromisoformat(fixture["date"])
+	return fixture["goals"]["home"] is not None and kickoff + FINISHED_AFTER <= now
+
+
+def is_sealed(documents: List[dict], now: Optional[datetime] = None) -> bool:
+	"""A round is sealed once all of its matches are finished; its documents won't change after that."""
+
+	now = now or datetime.now(timezone.utc)
+	return bool(documents) and all(is_finished(document["data"], now) for document in documents)
+
+
+class SealedRoundCache:
+	"""Fixtures of sealed rounds, kept in memory and as JSON files on disk for good."""
+
+	def __init__(self, directory: str):
+		self.directory = directory
+		self._rounds: Dict[int, List[dict]] = {}
+		self._lock = threading.Lock()
+		os.makedirs(directory, exist_ok=True)
+
+	def _path(self, round_count: int) -> str:
+		return os.path.join(self.directory, f"round-{round_count}.json")
+
+	def get(self, round_count: int) -> Optional[List[dict]]:
+		documents = self._rounds.get(round_count)
+		if documents is None:
+			try:
+				with open(self._path(round_count)) as file:
+					documents = json.load(file)
+			except (OSError, ValueError):
+				return None
+
+			with self._lock:
+				self._rounds[round_count] = documents
+
+		return documents
+
+	def put(self, round_count: int, documents: List[dict]) -> bool:
+		"""Keeps a round's documents if the round is sealed, and returns whether it was."""
+
+		if not is_sealed(documents):
+			return False
+
+		with self._lock:
+			self._rounds[round_count] = documents
+
+		path = self._path(round_count)
+		temporary_path = f"{path}.{threading.get_ident()}.tmp"
+		try:
+			with open(temporary_path, "w") as file:
+				json.dump(documents, file, default=str)
+			os.replace(temporary_path, path)
+		except OSError:
+			# The round is still served from memory.
+			if os.path.exists(temporary_path):
+				os.remove(temporary_path)
+
+		return True
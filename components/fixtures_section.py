@@ -1,92 +1,80 @@
 import streamlit as st
-from firebase_admin import firestore  # type: ignore
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
-from typing import List
-from typing import Tuple
+from typing import Dict, List
+
+from components.connections import sealed_rounds
+from shared.formatting import fixture_display_fields
+
+FIXTURES_MAX_WORKERS = 8
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def fetch_round(_backend, round_count: int) -> List[dict]:
+	# Each fixture's document ID (e.g., 'Manchester City vs Burnley') and its data, in ascending order by date.
+	return _backend.fixtures(round_count)
+
+
+def round_documents(backend, round_count: int) -> List[dict]:
+	"""Serves sealed rounds from the sealed round cache; other rounds are re-read every ten minutes."""
+
+	cache = sealed_rounds()
+	documents = cache.get(round_count)
+	if documents is None:
+		documents = fetch_round(backend, round_count)
+		cache.put(round_count, documents)
+
+	# Documents loaded before the display fields were written at ingest get them the first time they're served.
+	for document in documents:
+		if "kickoff" not in document["data"]:
+			document["data"].update(fixture_display_fields(document["data"]))
+
+	return documents
 
 
 class FixturesSection:
-	def __init__(self, firestore_database, max_round: int, min_round: int):
-		self.firestore_database = firestore_database
+	def __init__(self, backend, max_round: int, min_round: int):
+		self.backend = backend
 		self.max_round = int(max_round)
 		self.min_round = int(min_round)
 
-	def firestore_pull(
-		self, round_count
-	) -> Tuple[List[str], List[int], List[int], List[str], List[str], List[str], List[str]]:
-		# Calling each document in the collection in ascending order by date.
-		collection_ref = self.firestore_database.collection(f"Regular Season - {round_count}")
-		query = collection_ref.order_by("date", direction=firestore.Query.ASCENDING)
-		results = query.stream()
-
-		# Setting an empty list. This list will contain each fixture's details that can later be called by referencing its index.
-		documents = []
-
-		# Iterating through the query results to get the document ID (e.g., 'Manchester City vs Burnley') and its data.
-		for doc in results:
-			document_dict = {"id": doc.id, "data": doc.to_dict()}
-			documents.append(document_dict)
-
-		# Retrieving and formatting match date.
-		match_date = [
-			datetime.strptime(documents[count]["data"]["date"], "%Y-%m-%dT%H:%M:%S+00:00")
-			.strftime("%B %d{}, %Y - %H:%M")
-			.format(
-				"th"
-				if 4
-				<= int(datetime.strptime(documents[count]["data"]["date"], "%Y-%m-%dT%H:%M:%S+00:00").strftime("%d"))
-				<= 20
-				else {1: "st", 2: "nd", 3: "rd"}.get(
-					int(datetime.strptime(documents[count]["data"]["date"], "%Y-%m-%dT%H:%M:%S+00:00").strftime("%d"))
-					% 10,
-					"th",
-				)
-			)
-			for count in range(10)
-		]
-
-		# Retrieving away and home goals for each match.
-		away_goals = [documents[count]["data"]["goals"]["away"] for count in range(10)]
-		home_goals = [documents[count]["data"]["goals"]["home"] for count in range(10)]
-
-		# Retrieving away and home team for each match.
-		away_team = [documents[count]["data"]["teams"]["away"]["name"] for count in range(10)]
-		home_team = [documents[count]["data"]["teams"]["home"]["name"] for count in range(10)]
+	def fetch_rounds(self, rounds: List[int]) -> Dict[int, List[dict]]:
+		"""Reads the documents of several rounds at once."""
 
-		# Retrieving away and home logo for each team.
-		away_logo = [documents[count]["data"]["teams"]["away"]["logo"] for count in range(10)]
-		home_logo = [documents[count]["data"]["teams"]["home"]["logo"] for count in range(10)]
+		if len(rounds) == 1:
+			return {rounds[0]: round_documents(self.backend, rounds[0])}
 
-		return (
-			match_date,
-			away_goals,
-			home_goals,
-			away_team,
-			home_team,
-			away_logo,
-			home_logo,
-		)
+		with ThreadPoolExecutor(
+			max_workers=min(len(rounds), FIXTURES_MAX_WORKERS),
+			thread_name_prefix="fixtures",
+			initializer=add_script_run_ctx,
+			initargs=(None, get_script_run_ctx()),
+		) as executor:
+			documents = executor.map(lambda round_count: round_documents(self.backend, round_count), rounds)
+			return dict(zip(rounds, documents))
 
 	def display(self):
 		round_count = self.max_round
 		st.subheader("Fixtures")
 
+		# Only the current round and the older rounds whose toggle is on are read from Firestore.
+		opened_rounds = [self.max_round] + [
+			count
+			for count in range(self.max_round - 1, self.min_round - 1, -1)
+			if st.session_state.get(f"fixtures-round-{count}")
+		]
+		documents = self.fetch_rounds(opened_rounds)
+
 		while round_count >= self.min_round:
 			with st.expander(f"Round {round_count}"):
-				(
-					match_date,
-					away_goals,
-					home_goals,
-					away_team,
-					home_team,
-					away_logo,
-					home_logo,
-				) = self.firestore_pull(round_count)
-
-				count = 0
-
-				while count < 10:
+				if round_count != self.max_round and not st.toggle(
+					"Show fixtures", key=f"fixtures-round-{round_count}"
+				):
+					round_count -= 1
+					continue
+
+				for fixture in (document["data"] for document in documents[round_count]):
 					# Creating a container for each match.
 					with st.container():
 						col1, col2, col3, col4, col5 = st.columns(5)
@@ -97,11 +85,11 @@ class FixturesSection:
 						# Home teams
 						with col2:
 							st.markdown(
-								f"<h3 style='text-align: center;'>{home_goals[count]}</h3>",
+								f"<h3 style='text-align: center;'>{fixture['home_goals']}</h3>",
 								unsafe_allow_html=True,
 							)
 							st.markdown(
-								f"<img style='display: block; margin-left: auto; margin-right: auto; width: 75px;' src='{home_logo[count]}'/>",
+								f"<img style='display: block; margin-left: auto; margin-right: auto; width: 75px;' src='{fixture['home_logo']}'/>",
 								unsafe_allow_html=True,
 							)
 							st.write("")
@@ -115,22 +103,22 @@ class FixturesSection:
 								unsafe_allow_html=True,
 							)
 							st.markdown(
-								f"<p style='text-align: center;'>{match_date[count]}</p>",
+								f"<p style='text-align: center;'>{fixture['kickoff']}</p>",
 								unsafe_allow_html=True,
 							)
 							st.markdown(
-								f"<p style='text-align: center;'>{home_team[count]} vs. {away_team[count]}</p>",
+								f"<p style='text-align: center;'>{fixture['home_team']} vs. {fixture['away_team']}</p>",
 								unsafe_allow_html=True,
 							)
 
 						# Away teams
 						with col4:
 							st.markdown(
-								f"<h3 style='text-align: center;'>{away_goals[count]}</h3>",
+								f"<h3 style='text-align: center;'>{fixture['away_goals']}</h3>",
 								unsafe_allow_html=True,
 							)
 							st.markdown(
-								f"<img style='display: block; margin-left: auto; margin-right: auto; width: 75px;' src='{away_logo[count]}'/>",
+								f"<img style='display: block; margin-left: auto; margin-right: auto; width: 75px;' src='{fixture['away_logo']}'/>",
 								unsafe_allow_html=True,
 							)
 							st.write("")
@@ -139,6 +127,4 @@ class FixturesSection:
 						with col5:
 							st.write("")
 
-					count += 1
-
 			round_count -= 1
@@ -1,9 +1,27 @@
+from typing import Dict, Tuple
+
+import pandas as pd
 import streamlit as st
 
+from components.render_cache import render_cache
+
+
+def partition_injuries(injuries_df: pd.DataFrame) -> Tuple[Dict[str, pd.DataFrame], pd.DataFrame]:
+	"""Splits the injuries into one ready-to-display frame per team, plus an empty one."""
+
+	display_df = injuries_df.drop(columns=["team_id", "player_id", "team_name"])
+	groups = injuries_df.groupby("team_name", sort=False).indices
+	partitions = {team: display_df.take(rows) for team, rows in groups.items()}
+
+	return partitions, display_df.iloc[0:0]
+
 
 class InjuriesSection:
 	def __init__(self, injuries_df):
 		self.injuries_df = injuries_df
+		self.partitions, self.empty_df = render_cache.get(
+			"injury_partitions", injuries_df, lambda: partition_injuries(injuries_df)
+		)
 		self.teams = (
 			"Arsenal",
 			"Aston Villa",
@@ -32,7 +50,6 @@ class InjuriesSection:
 		st.subheader("Recent Injuries")
 		st.write("Select the teams you want to see recent injuries for.")
 		popover = st.popover("Filter Teams")
-		filtered_df = self.injuries_df.drop(columns=["team_id", "player_id"])
 		team_checkboxes = {}
 
 		for team in self.teams:
@@ -40,8 +57,7 @@ class InjuriesSection:
 
 		for team, is_checked in team_checkboxes.items():
 			if is_checked:
-				team_df = filtered_df[(filtered_df["team_name"] == team)]
-				team_df = team_df.drop(columns=["team_name"])
+				team_df = self.partitions.get(team, self.empty_df)
 				st.write(f"**{team}**")
 				if team_df.empty:
 					st.write("No recent injuries reported.")
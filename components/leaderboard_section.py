@@ -0,0 +1,56 @@
+from typing import Dict, Tuple
+
+import pandas as pd
+import streamlit as st
+
+from components.render_cache import render_cache
+
+# How many places are ranked for each metric; any top-N view up to this is served from the ranks.
+LEADERBOARD_DEPTH = 10
+
+
+class Leaderboard:
+	"""Ranks every numeric column of a frame once, then serves top-N tables from those ranks."""
+
+	def __init__(self, frame: pd.DataFrame, label_column: str, depth: int = LEADERBOARD_DEPTH):
+		self.frame = frame
+		self.label_column = label_column
+		self.ranks = {
+			metric: frame[metric].nlargest(depth, keep="first").index
+			for metric in frame.select_dtypes("number").columns
+		}
+		self._views: Dict[Tuple[str, int, str], pd.DataFrame] = {}
+
+	def top(self, metric: str, n: int, title: str) -> pd.DataFrame:
+		key = (metric, n, title)
+		if key not in self._views:
+			rows = self.frame.loc[self.ranks[metric][:n]]
+			self._views[key] = pd.DataFrame(
+				{title: rows[metric].to_numpy(), self.label_column.title(): rows[self.label_column].to_numpy()}
+			)
+
+		return self._views[key]
+
+
+class LeaderboardSection:
+	def __init__(self, frame: pd.DataFrame, label_column: str = "team"):
+		self.leaderboard = render_cache.get(
+			"leaderboard", frame, lambda: Leaderboard(frame, label_column), label_column
+		)
+
+	def display(self, metric: str, title: str, help: str, format: str, n: int = 5):
+		table = self.leaderboard.top(metric, n, title)
+
+		st.dataframe(
+			table,
+			column_config={
+				title: st.column_config.ProgressColumn(
+					title,
+					help=help,
+					format=format,
+					min_value=0,
+					max_value=int(round(table[title].iloc[0], 2)) * 2,
+				),
+			},
+			hide_index=True,
+		)
@@ -1,5 +1,7 @@
 import streamlit as st
 
+from components.render_cache import render_cache
+
 
 class LeagueFormsSection:
 	def __init__(self, teams_df):
@@ -20,10 +22,14 @@ class LeagueFormsSection:
 	def display(self):
 		st.subheader("Forms for the Rest of the League")
 		columns = st.columns(5)
+		markdown_lists = render_cache.get(
+			"league_forms",
+			self.teams_df,
+			lambda: [self.generate_team_html([i + 5, i + 10, i + 15]) for i in range(5)],
+		)
 
 		for i, col in enumerate(columns):
 			with col:
-				team_indices = [i + 5, i + 10, i + 15]
-				markdown_list = self.generate_team_html(team_indices)
+				markdown_list = markdown_lists[i]
 				for item in markdown_list:
 					st.markdown(item, unsafe_allow_html=True)
@@ -1,49 +1,73 @@
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
 
+from components.figure_templates import figure_template
+from components.render_cache import render_cache
 
-class PointProgressionSection:
-	def __init__(self, teams_df, standings_df):
-		self.teams_df = teams_df
-		self.standings_df = standings_df
+# Points per result, indexed by the result's ASCII code; padding after a shorter form is byte 0.
+RESULT_POINTS = np.zeros(256, dtype=np.int8)
+RESULT_POINTS[ord("W")] = 3
+RESULT_POINTS[ord("D")] = 1
 
-	def calculate_points(self):
-		team_forms = [[], [], [], [], []]
-		forms = [self.teams_df.iloc[i, 1] for i in range(5)]
+COLORS = ["#1e90ff", "#ff4500", "#ffd700", "#228b22", "#000000"]
 
-		for count, form in enumerate(forms):
-			points = 0
-			for char in form:
-				if char == "W":
-					points += 3
-				elif char == "D":
-					points += 1
-				else:
-					points += 0
 
-				team_forms[count].append(points)
+def points_progression(teams_df: pd.DataFrame) -> pd.DataFrame:
+	"""Returns every team's cumulative points after each game, one column per team_id."""
 
-		return team_forms
+	forms = teams_df["form"].fillna("").to_numpy(dtype=str)
+	width = max((len(form) for form in forms), default=0)
+	# Before the first round every form is empty, so there are no games to chart.
+	if width == 0:
+		return pd.DataFrame(columns=teams_df["team_id"].to_numpy(), dtype=np.float64)
 
-	def create_dataframe(self, team_forms):
-		headers = [str(self.standings_df.iloc[i, 3]) for i in range(5)]
-		zipped = list(zip(*team_forms))  # Transpose the list of lists
-		return pd.DataFrame(zipped, columns=headers)
+	codes = forms.astype(f"S{width}").view(np.uint8).reshape(len(forms), width)
 
-	def display(self):
-		team_forms = self.calculate_points()
-		df = self.create_dataframe(team_forms)
+	cumulative = RESULT_POINTS[codes].cumsum(axis=1, dtype=np.int16)
+	progression = np.where(codes == 0, np.nan, cumulative)
+
+	return pd.DataFrame(progression.T, columns=teams_df["team_id"].to_numpy())
 
+
+class PointProgressionSection:
+	def __init__(self, teams_df, standings_df):
+		self.teams_df = teams_df
+		self.standings_df = standings_df
+		self.progression = render_cache.get("points_progression", teams_df, lambda: points_progression(teams_df))
+
+	def display(self):
 		st.subheader("Point Progression throughout the Season")
 
-		labels = [str(f"{self.standings_df.iloc[i, 3]} - {self.standings_df.iloc[i, 1]} points") for i in range(5)]
-		colors = ["#1e90ff", "#ff4500", "#ffd700", "#228b22", "#000000"]
+		standings = self.standings_df.set_index("team_id")
+		team_ids = standings.index.tolist()
+		selected_teams = st.multiselect(
+			"Teams:",
+			options=team_ids,
+			default=team_ids[:5],
+			format_func=lambda team_id: standings.at[team_id, "team"],
+			key="point-progression-teams",
+		)
+
+		traces = []
+		for i, team_id in enumerate(selected_teams):
+			label = f"{standings.at[team_id, 'team']} - {standings.at[team_id, 'points']} points"
+			color = COLORS[i] if i < len(COLORS) else None
+			traces.append(
+				{
+					"x": self.progression.index.tolist(),
+					"y": self.progression[team_id].tolist(),
+					"name": label,
+					"line": {"color": color, "width": 2},
+				}
+			)
 
-		fig = go.Figure()
+		template = figure_template("point_progression", self.teams_df, self.build_figure)
+		st.plotly_chart(template.patch(traces), use_container_width=True)
 
-		for i in range(5):
-			fig.add_trace(go.Scatter(x=df.index, y=df.iloc[:, i], name=labels[i], line=dict(color=colors[i], width=2)))
+	def build_figure(self):
+		fig = go.Figure(go.Scatter(line=dict(width=2)))
 
 		# add markers
 		fig.update_traces(mode="markers+lines", marker=dict(size=8, line=dict(width=2)))
@@ -56,4 +80,4 @@ class PointProgressionSection:
 			height=600,
 		)
 
-		st.plotly_chart(fig, use_container_width=True)
+		return fig
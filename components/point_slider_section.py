@@ -1,42 +1,38 @@
+import numpy as np
 import streamlit as st
 import plotly.graph_objects as go
 
+from components.figure_templates import figure_template
+from components.render_cache import render_cache
+
+
+def sorted_points(standings_df):
+	"""Returns the teams and their points by descending points, ties in standings order, for `searchsorted`."""
+
+	points = standings_df["points"].to_numpy(dtype=np.int64)
+	# Sorting the negated points ascending keeps ties in standings order.
+	order = np.argsort(-points, kind="stable")
+	return standings_df["team"].to_numpy()[order], -points[order]
+
+
+def points_range(negated_points: np.ndarray, low: int, high: int) -> slice:
+	"""Returns the positions, in `sorted_points` order, of the teams with `low` to `high` points."""
+
+	start = np.searchsorted(negated_points, -high, side="left")
+	stop = np.searchsorted(negated_points, -low, side="right")
+	return slice(int(start), int(stop))
+
 
 class PointSliderSection:
 	def __init__(self, standings_df):
 		self.standings_df = standings_df
-
-	def display(self):
-		st.subheader("Points per Team:")
-		# Creating the slider.
-		points = self.standings_df["points"].tolist()
-		points_selection = st.slider(
-			"Select a Range of Points:", min_value=min(points), max_value=max(points), value=(min(points), max(points))
+		self.teams, self.negated_points = render_cache.get(
+			"sorted_points", standings_df, lambda: sorted_points(standings_df)
 		)
-		# Picking colors to use for the bar chart.
-		colors = [
-			"indigo",
-		] * 20
-		# Making sure the bar chart changes with the slider.
-		mask = self.standings_df["points"].between(*points_selection)
-		amount_of_teams = self.standings_df[mask].shape[0]
 
-		df_grouped = self.standings_df[mask]
-		df_grouped = df_grouped.reset_index()
-		lowest_number = df_grouped["points"].min()
-		st.markdown(f"Number of teams with {lowest_number} or more points: {amount_of_teams}")
-		# Creating the bar chart.
-		points_chart = go.Figure(
-			data=[
-				go.Bar(
-					x=df_grouped["team"],
-					y=df_grouped["points"],
-					marker_color=colors,
-					text=df_grouped["points"],
-					textposition="auto",
-				)
-			]
-		)
+	def build_figure(self):
+		# Picking colors to use for the bar chart.
+		points_chart = go.Figure(data=[go.Bar(marker_color="indigo", textposition="auto")])
 		# Rotating x axis lables.
 		points_chart.update_layout(
 			xaxis_tickangle=-35,
@@ -48,5 +44,24 @@ class PointSliderSection:
 				t=0,  # top
 			),
 		)
+		return points_chart
+
+	def display(self):
+		st.subheader("Points per Team:")
+		# Creating the slider.
+		min_points, max_points = int(-self.negated_points[-1]), int(-self.negated_points[0])
+		low, high = st.slider(
+			"Select a Range of Points:", min_value=min_points, max_value=max_points, value=(min_points, max_points)
+		)
+		# Making sure the bar chart changes with the slider.
+		selected = points_range(self.negated_points, low, high)
+		teams = self.teams[selected].tolist()
+		points = (-self.negated_points[selected]).tolist()
+
+		lowest_number = points[-1] if points else np.nan
+		st.markdown(f"Number of teams with {lowest_number} or more points: {len(points)}")
+		# Creating the bar chart.
+		template = figure_template("point_slider", self.standings_df, self.build_figure)
+		points_chart = template.patch([{"x": teams, "y": points, "text": points}])
 
 		st.plotly_chart(points_chart, use_container_width=True)
@@ -0,0 +1,84 @@
+import glob
+import hashlib
+import os
+import threading
+from typing import List, Optional
+
+import pandas as pd
+import pyarrow as pa  # type: ignore
+
+
+class QueryCache:
+	"""Size-bounded on-disk cache of query results, stored as Parquet files keyed by SQL and data version."""
+
+	def __init__(self, directory: str, max_bytes: int):
+		self.directory = directory
+		self.max_bytes = max_bytes
+		self._lock = threading.Lock()
+		os.makedirs(directory, exist_ok=True)
+
+	@staticmethod
+	def normalize(query: str) -> str:
+		# Indentation and trailing semicolons don't change the result.
+		return " ".join(query.split()).rstrip(";").strip()
+
+	def _digest(self, text: str) -> str:
+		return hashlib.sha256(text.encode("UTF-8")).hexdigest()[:16]
+
+	def _path(self, query: str, version: Optional[str]) -> str:
+		query_key = self._digest(self.normalize(query))
+		version_key = self._digest(version or "unversioned")
+		return os.path.join(self.directory, f"{query_key}-{version_key}.parquet")
+
+	def _read(self, path: str) -> Optional[pd.DataFrame]:
+		try:
+			frame = pd.read_parquet(path)
+			# Touching the file keeps the least recently used order for eviction.
+			os.utime(path)
+		except (OSError, pa.ArrowException):
+			return None
+
+		return frame
+
+	def get(self, query: str, version: Optional[str]) -> Optional[pd.DataFrame]:
+		return self._read(self._path(query, version))
+
+	def latest(self, query: str) -> Optional[pd.DataFrame]:
+		"""Returns the most recently written result for a query, whatever its data version."""
+
+		query_key = self._digest(self.normalize(query))
+		paths = sorted(glob.glob(os.path.join(self.directory, f"{query_key}-*.parquet")), key=os.path.getmtime)
+		if not paths:
+			return None
+
+		return self._read(paths[-1])
+
+	def put(self, query: str, version: Optional[str], frame: pd.DataFrame) -> None:
+		path = self._path(query, version)
+		temporary_path = f"{path}.{threading.get_ident()}.tmp"
+		try:
+			frame.to_parquet(temporary_path, index=False)
+			os.replace(temporary_path, path)
+		except (OSError, ValueError, pa.ArrowException):
+			# Some results can't be written as Parquet; they're still served from memory.
+			if os.path.exists(temporary_path):
+				os.remove(temporary_path)
+			return
+
+		self.evict()
+
+	def evict(self) -> List[str]:
+		"""Deletes the least recently used files until the cache fits within `max_bytes`."""
+
+		removed = []
+		with self._lock:
+			paths = sorted(glob.glob(os.path.join(self.directory, "*.parquet")), key=os.path.getmtime)
+			total_bytes = sum(os.path.getsize(path) for path in paths)
+			for path in paths:
+				if total_bytes <= self.max_bytes:
+					break
+				total_bytes -= os.path.getsize(path)
+				os.remove(path)
+				removed.append(path)
+
+		return removed
@@ -0,0 +1,49 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, TypeVar
+
+import pandas as pd
+
+T = TypeVar("T")
+
+RENDER_CACHE_MAX_ENTRIES = 256
+
+
+def frame_version(frame: pd.DataFrame) -> str:
+	"""Returns the data version the loader tagged a frame with, or a hash of its contents."""
+
+	version = frame.attrs.get("data_version")
+	if version is not None:
+		return version
+
+	digest = hashlib.sha256(",".join(map(str, frame.columns)).encode("UTF-8"))
+	digest.update(pd.util.hash_pandas_object(frame).values.tobytes())
+	return digest.hexdigest()
+
+
+class RenderCache:
+	"""Process-wide memo of rendered section output, keyed by section, data version and arguments."""
+
+	def __init__(self, max_entries: int = RENDER_CACHE_MAX_ENTRIES):
+		self.max_entries = max_entries
+		self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+		self._lock = threading.Lock()
+
+	def get(self, section: str, frame: pd.DataFrame, render: Callable[[], T], *args: Hashable) -> T:
+		key = (section, frame_version(frame), *args)
+		with self._lock:
+			if key in self._entries:
+				self._entries.move_to_end(key)
+				return self._entries[key]
+
+		value = render()
+		with self._lock:
+			self._entries[key] = value
+			while len(self._entries) > self.max_entries:
+				self._entries.popitem(last=False)
+
+		return value
+
+
+render_cache = RenderCache()
@@ -1,30 +1,49 @@
+from typing import Dict, Tuple
+
+import pandas as pd
 import streamlit as st
 
+from components.render_cache import render_cache
+
+
+def partition_squads(squads_df: pd.DataFrame) -> Tuple[Dict[Tuple[str, str], pd.DataFrame], pd.DataFrame]:
+	"""Splits the squads into one ready-to-display frame per team and position, plus an empty one."""
+
+	display_df = squads_df.drop(columns=["team_id", "team_name", "player_id", "player_position"])
+	groups = squads_df.groupby(["team_name", "player_position"], sort=False).indices
+	partitions = {key: display_df.take(rows) for key, rows in groups.items()}
+
+	return partitions, display_df.iloc[0:0]
+
 
 class SquadSection:
+	teams = (
+		"Arsenal",
+		"Aston Villa",
+		"Bournemouth",
+		"Brentford",
+		"Brighton",
+		"Burnley",
+		"Chelsea",
+		"Crystal Palace",
+		"Everton",
+		"Fulham",
+		"Liverpool",
+		"Luton",
+		"Manchester City",
+		"Manchester United",
+		"Newcastle",
+		"Nottingham Forest",
+		"Sheffield Utd",
+		"Tottenham",
+		"West Ham",
+		"Wolves",
+	)
+
 	def __init__(self, squads_df):
 		self.squads_df = squads_df
-		self.teams = (
-			"Arsenal",
-			"Aston Villa",
-			"Bournemouth",
-			"Brentford",
-			"Brighton",
-			"Burnley",
-			"Chelsea",
-			"Crystal Palace",
-			"Everton",
-			"Fulham",
-			"Liverpool",
-			"Luton",
-			"Manchester City",
-			"Manchester United",
-			"Newcastle",
-			"Nottingham Forest",
-			"Sheffield Utd",
-			"Tottenham",
-			"West Ham",
-			"Wolves",
+		self.partitions, self.empty_df = render_cache.get(
+			"squad_partitions", squads_df, lambda: partition_squads(squads_df)
 		)
 
 	def display(self, team_name):
@@ -35,10 +54,7 @@ class SquadSection:
 		with col1:
 			top_positions = ["Goalkeeper", "Midfielder"]
 			for position in top_positions:
-				filtered_df = self.squads_df[
-					(self.squads_df["team_name"] == team_name) & (self.squads_df["player_position"] == position)
-				]
-				filtered_df = filtered_df.drop(columns=["team_id", "team_name", "player_id", "player_position"])
+				filtered_df = self.partitions.get((team_name, position), self.empty_df)
 
 				st.write(f"**{position}s**")
 				st.data_editor(
@@ -54,10 +70,7 @@ class SquadSection:
 		with col2:
 			bottom_positions = ["Defender", "Attacker"]
 			for position in bottom_positions:
-				filtered_df = self.squads_df[
-					(self.squads_df["team_name"] == team_name) & (self.squads_df["player_position"] == position)
-				]
-				filtered_df = filtered_df.drop(columns=["team_id", "team_name", "player_id", "player_position"])
+				filtered_df = self.partitions.get((team_name, position), self.empty_df)
 
 				st.write(f"**{position}s**")
 				st.data_editor(
@@ -69,3 +82,16 @@ class SquadSection:
 					hide_index=True,
 					key=f"{team_name}-{position}",
 				)
+
+	def display_all(self):
+		st.data_editor(
+			self.squads_df.drop(columns=["team_id", "player_id"]),
+			column_config={
+				"team_name": st.column_config.TextColumn("Team"),
+				"player_name": st.column_config.TextColumn("Player Name"),
+				"player_photo": st.column_config.ImageColumn("Photo", width="small"),
+				"player_position": st.column_config.TextColumn("Position"),
+			},
+			hide_index=True,
+			key="all-squads",
+		)
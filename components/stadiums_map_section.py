@@ -1,25 +1,17 @@
 import streamlit as st
 import plotly.express as px  # type: ignore
-from google.cloud import secretmanager
 
-
-def gcp_secret_rapid_api() -> str:
-	"""This function retrieves the Mapbox API key from GCP Secret Manager"""
-
-	client = secretmanager.SecretManagerServiceClient()
-	name = "projects/463690670206/secrets/mapbox-api/versions/1"
-	response = client.access_secret_version(request={"name": name})
-	mapbox_api_key = response.payload.data.decode("UTF-8")
-
-	return mapbox_api_key
+from components.figure_templates import figure_template
+from shared.secret_provider import get_secret
 
 
 class StadiumMapSection:
 	def __init__(self):
-		self.mapbox_access_token = gcp_secret_rapid_api()
+		# MAPBOX_ACCESS_TOKEN lets the dashboard run offline against the local backend.
+		self.mapbox_access_token = get_secret("mapbox-api", env_var="MAPBOX_ACCESS_TOKEN")
 		px.set_mapbox_access_token(self.mapbox_access_token)
 
-	def create_stadium_map(self, stadiums_df):
+	def build_stadium_map(self, stadiums_df):
 		stadium_map = px.scatter_mapbox(
 			stadiums_df,
 			lat="latitude",
@@ -38,6 +30,13 @@ class StadiumMapSection:
 
 		stadium_map.update_mapboxes(zoom=4)
 
+		return stadium_map
+
+	def create_stadium_map(self, stadiums_df):
+		# The map only changes with the stadiums data, so it is built once per data version.
+		template = figure_template("stadium_map", stadiums_df, lambda: self.build_stadium_map(stadiums_df))
+		stadium_map = template.figure()
+
 		map_plotly_chart = st.plotly_chart(
 			stadium_map, height=1000, use_container_width=True
 		)
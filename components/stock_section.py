@@ -1,5 +1,55 @@
+import math
+import os
+from datetime import datetime, time, timedelta
+
 import streamlit as st
 import altair as alt
+import plotly.graph_objects as go
+
+from components.connections import NEW_YORK, STOCK_ROLLUPS, get_stock_rollup
+from components.downsampling import lttb
+from components.figure_templates import figure_template, vega_lite_spec
+from components.render_cache import render_cache
+
+# The most prices the chart is sent; longer series are downsampled to this many points.
+STOCK_CHART_POINTS = int(os.environ.get("STOCK_CHART_POINTS", "1000"))
+# Series with more rows than this are drawn with WebGL instead of Vega-Lite's SVG.
+STOCK_WEBGL_ROWS = int(os.environ.get("STOCK_WEBGL_ROWS", "5000"))
+
+# Chart windows in calendar days. "1 Day" draws the previous trading day's quotes, longer windows OHLC rollups.
+STOCK_WINDOWS = {"1 Day": 1, "1 Week": 7, "1 Month": 31, "3 Months": 92, "1 Year": 366}
+TRADING_DAY = timedelta(hours=6, minutes=30)
+
+
+def eastern_prices(stock_df):
+	"""Returns a copy of the prices with `new_york_time` in US/Eastern."""
+
+	stock_df = stock_df.copy()
+	# Check if the timezone is already set
+	if stock_df["new_york_time"].dt.tz is not None:
+		stock_df["new_york_time"] = stock_df["new_york_time"].dt.tz_convert("US/Eastern")
+	else:
+		stock_df["new_york_time"] = stock_df["new_york_time"].dt.tz_localize("US/Eastern")
+	return stock_df
+
+
+def downsampled_prices(stock_df, points):
+	"""Returns the US/Eastern prices downsampled to at most `points` rows with LTTB."""
+
+	prices = eastern_prices(stock_df).sort_values("new_york_time", ignore_index=True)
+	picked = lttb(prices["new_york_time"].astype("int64").to_numpy(), prices["price"].to_numpy(dtype=float), points)
+	return prices.iloc[picked].reset_index(drop=True)
+
+
+def pick_rollup(window_days: int, points: int) -> str:
+	"""Returns the finest rollup whose buckets over the window fit in `points`, or the coarsest one."""
+
+	trading_days = math.ceil(window_days * 5 / 7)
+	for rollup, bucket in STOCK_ROLLUPS.items():
+		if trading_days * math.ceil(TRADING_DAY / bucket) <= points:
+			return rollup
+
+	return rollup
 
 
 class StockSection:
@@ -7,6 +57,25 @@ class StockSection:
 		self.stock_df = stock_df
 		self.line_chart = None
 
+	def build_chart(self):
+		return (
+			alt.Chart()
+			.mark_line()
+			.encode(
+				x=alt.X("new_york_time:T", title="Time"),
+				y=alt.Y("price:Q", title="Price").scale(zero=False),
+			)
+		)
+
+	def build_webgl_chart(self):
+		line_chart = go.Figure(go.Scattergl(mode="lines", line=dict(width=1.5)))
+		line_chart.update_layout(
+			xaxis_title="Time",
+			yaxis_title="Price",
+			margin=dict(l=0, r=0, b=0, t=0),
+		)
+		return line_chart
+
 	def display(self):
 		st.subheader("MANU - Stock Price")
 		st.info(
@@ -17,22 +86,72 @@ class StockSection:
 			Since this shows the previous trading day's data, there will be no data displayed on Sunday and Monday, New York time.
 			"""
 		)
+		window = st.radio("Window:", list(STOCK_WINDOWS), horizontal=True, key="stock-window")
+		if STOCK_WINDOWS[window] == 1:
+			self.display_previous_day()
+		else:
+			self.display_rollup(STOCK_WINDOWS[window])
+
+	def display_previous_day(self):
 		if self.stock_df.empty:
 			st.warning("No data for today. Check back **after** the next trading day.")
 		else:
-			# Check if the timezone is already set
-			if self.stock_df["new_york_time"].dt.tz is not None:
-				self.stock_df["new_york_time"] = self.stock_df["new_york_time"].dt.tz_convert("US/Eastern")
-			else:
-				self.stock_df["new_york_time"] = self.stock_df["new_york_time"].dt.tz_localize("US/Eastern")
-
-			self.line_chart = (
-				alt.Chart(self.stock_df)
-				.mark_line()
-				.encode(
-					x=alt.X("new_york_time:T", title="Time"),
-					y=alt.Y("price:Q", title="Price").scale(zero=False),
-				)
+			prices = render_cache.get(
+				"stock_prices_downsampled",
+				self.stock_df,
+				lambda: downsampled_prices(self.stock_df, STOCK_CHART_POINTS),
+				STOCK_CHART_POINTS,
 			)
 
-			st.altair_chart(self.line_chart, use_container_width=True)
+			if len(self.stock_df) > STOCK_WEBGL_ROWS:
+				# Plotly has no time zones, so the trace is sent New York wall-clock times.
+				trace = render_cache.get(
+					"stock_webgl_trace",
+					self.stock_df,
+					lambda: {
+						"x": prices["new_york_time"].dt.tz_localize(None).to_numpy(),
+						"y": prices["price"].to_numpy(),
+					},
+					STOCK_CHART_POINTS,
+				)
+				template = figure_template("stock_webgl", self.stock_df, self.build_webgl_chart)
+				self.line_chart = template.patch([trace])
+				st.plotly_chart(self.line_chart, use_container_width=True)
+			else:
+				self.line_chart = vega_lite_spec("stock", self.stock_df, self.build_chart)
+				st.vega_lite_chart(prices, self.line_chart, use_container_width=True)
+
+	def build_candlestick_chart(self, rollup):
+		candlestick_chart = go.Figure(go.Candlestick(increasing_line_color="green", decreasing_line_color="red"))
+		# Hiding weekends, and nights for the intraday rollups.
+		rangebreaks = [dict(bounds=["sat", "mon"])]
+		if STOCK_ROLLUPS[rollup] < timedelta(days=1):
+			rangebreaks.append(dict(bounds=[16, 9.5], pattern="hour"))
+		candlestick_chart.update_layout(
+			xaxis_title="Time",
+			yaxis_title="Price",
+			xaxis_rangeslider_visible=False,
+			xaxis_rangebreaks=rangebreaks,
+			margin=dict(l=0, r=0, b=0, t=0),
+		)
+		return candlestick_chart
+
+	def display_rollup(self, window_days):
+		# Windows end on the latest trading day with quotes, so the rollup query only changes once a day.
+		if self.stock_df.empty:
+			latest = datetime.now(NEW_YORK).date()
+		else:
+			latest = self.stock_df["new_york_time"].max().date()
+		start = datetime.combine(latest - timedelta(days=window_days), time())
+
+		rollup = pick_rollup(window_days, STOCK_CHART_POINTS)
+		candles = get_stock_rollup(rollup, start)
+		if candles.empty:
+			st.warning("No prices for this window yet.")
+			return
+
+		st.caption(f"{rollup} candles")
+		template = figure_template(f"stock_{rollup}", candles, lambda: self.build_candlestick_chart(rollup))
+		trace = {column: candles[column].to_numpy() for column in ("open", "high", "low", "close")}
+		self.line_chart = template.patch([{"x": candles["bucket_start"].to_numpy(), **trace}])
+		st.plotly_chart(self.line_chart, use_container_width=True)
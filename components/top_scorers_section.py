@@ -1,5 +1,7 @@
 import streamlit as st
 
+from components.render_cache import render_cache
+
 
 class TopScorersSection:
 	def __init__(self, top_scorers_df):
@@ -20,9 +22,12 @@ class TopScorersSection:
 		with st.container():
 			st.subheader("Top 5 Scorers")
 			columns = st.columns(5)
+			markdown_lists = render_cache.get(
+				"top_scorers", self.top_scorers_df, lambda: [self.generate_scorer_html(i) for i in range(5)]
+			)
 
 			for i, col in enumerate(columns):
 				with col:
-					markdown_list = self.generate_scorer_html(i)
+					markdown_list = markdown_lists[i]
 					for item in markdown_list:
 						st.markdown(item, unsafe_allow_html=True)
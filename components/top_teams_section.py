@@ -1,5 +1,7 @@
 import streamlit as st
 
+from components.render_cache import render_cache
+
 
 class TopTeamsSection:
 	def __init__(self, teams_df):
@@ -19,9 +21,12 @@ class TopTeamsSection:
 		with st.container():
 			st.subheader("Top 5 Teams")
 			columns = st.columns(5)
+			markdown_lists = render_cache.get(
+				"top_teams", self.teams_df, lambda: [self.generate_team_html(i) for i in range(5)]
+			)
 
 			for i, col in enumerate(columns):
 				with col:
-					markdown_list = self.generate_team_html(i)
+					markdown_list = markdown_lists[i]
 					for item in markdown_list:
 						st.markdown(item, unsafe_allow_html=True)
@@ -0,0 +1,47 @@
+{#
+    Open, high, low and close prices of the `stocks` mart per ticker and bucket, New York time.
+    `bucket_minutes` must divide an hour; `none` buckets by day. Incremental runs re-read
+    the mart's partitions from the day before the newest bucket and merge on symbol and
+    bucket_start, so buckets that were still open, or whose ticker lagged, are recomputed.
+#}
+{% macro stock_ohlc(bucket_minutes=none) %}
+WITH quotes AS (
+    SELECT
+        symbol,
+        new_york_time,
+        price
+    FROM
+        {{ ref('stocks') }}
+    {% if is_incremental() %}
+    WHERE
+        new_york_date >= DATE_SUB((SELECT DATE(MAX(bucket_start)) FROM {{ this }}), INTERVAL 1 DAY)
+    {% endif %}
+),
+
+buckets AS (
+    SELECT
+        {% if bucket_minutes %}
+        DATETIME_SUB(
+            DATETIME_TRUNC(new_york_time, MINUTE),
+            INTERVAL MOD(EXTRACT(MINUTE FROM new_york_time), {{ bucket_minutes }}) MINUTE
+        ) AS bucket_start,
+        {% else %}
+        DATETIME_TRUNC(new_york_time, DAY) AS bucket_start,
+        {% endif %}
+        symbol,
+        new_york_time,
+        price
+    FROM quotes
+)
+
+SELECT
+    symbol,
+    bucket_start,
+    ROUND(ARRAY_AGG(price ORDER BY new_york_time LIMIT 1)[OFFSET(0)], 2) AS open,
+    ROUND(MAX(price), 2) AS high,
+    ROUND(MIN(price), 2) AS low,
+    ROUND(ARRAY_AGG(price ORDER BY new_york_time DESC LIMIT 1)[OFFSET(0)], 2) AS close,
+    COUNT(*) AS quotes
+FROM buckets
+GROUP BY symbol, bucket_start
+{% endmacro %}
@@ -1,16 +1,47 @@
-WITH date_cte AS (
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='merge',
+        unique_key=['symbol', 'timestamp'],
+        partition_by={'field': 'new_york_date', 'data_type': 'date', 'granularity': 'day'},
+        cluster_by=['symbol', 'new_york_time'],
+        incremental_predicates=["DBT_INTERNAL_DEST.new_york_date >= DATE_SUB(CURRENT_DATE('America/New_York'), INTERVAL 7 DAY)"]
+    )
+}}
+
+WITH quotes AS (
     SELECT
-        FORMAT_TIMESTAMP('%Y%m%d', TIMESTAMP_SECONDS(timestamp)) AS formatted_date,
-        FORMAT_TIMESTAMP('%H:%M:%S', TIMESTAMP_SECONDS(timestamp), 'America/New_York') AS formatted_time,
+        symbol,
+        timestamp,
         DATETIME(TIMESTAMP_SECONDS(timestamp), 'America/New_York') AS new_york_time,
         ROUND(price, 2) AS price
-    FROM 
-        `premier_league_dataset.public_stocks`
-    WHERE 
-        DATE(TIMESTAMP_SECONDS(timestamp), 'America/New_York') IN (DATE_SUB(DATE(CURRENT_DATETIME('America/New_York')), INTERVAL 1 DAY))
-)  
+    FROM
+        `premier_league_dataset.public_stocks` AS public_stocks
+    {% if is_incremental() %}
+    -- A day of overlap picks up tickers whose latest quote is older than another ticker's. Quotes already in
+    -- the mart are left out here, since the merge only matches the mart's last 7 days and the overlap can
+    -- reach further back after a stalled load.
+    WHERE
+        timestamp >= (SELECT MAX(timestamp) - 86400 FROM {{ this }})
+        AND NOT EXISTS (
+            SELECT 1
+            FROM {{ this }} AS mart
+            WHERE
+                mart.new_york_date = DATE(TIMESTAMP_SECONDS(public_stocks.timestamp), 'America/New_York')
+                AND mart.symbol = public_stocks.symbol
+                AND mart.timestamp = public_stocks.timestamp
+        )
+    {% endif %}
+)
 
-SELECT formatted_time, new_york_time, price
-FROM date_cte
-WHERE formatted_time < '16:00:00'
-ORDER BY date_cte.new_york_time DESC
\ No newline at end of file
+SELECT
+    symbol,
+    timestamp,
+    DATE(new_york_time) AS new_york_date,
+    FORMAT_DATETIME('%H:%M:%S', new_york_time) AS formatted_time,
+    new_york_time,
+    price
+FROM quotes
+WHERE TIME(new_york_time) < '16:00:00'
+-- A quote loaded twice, e.g. by scheduled runs while the market is closed, is kept once.
+QUALIFY ROW_NUMBER() OVER (PARTITION BY symbol, timestamp) = 1
@@ -0,0 +1,10 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='merge',
+        unique_key=['symbol', 'bucket_start'],
+        partition_by={'field': 'bucket_start', 'data_type': 'datetime', 'granularity': 'month'}
+    )
+}}
+
+{{ stock_ohlc(30) }}
@@ -0,0 +1,12 @@
+{#
+    Fails for every combination of `columns` that appears in more than one row of the model,
+    e.g. a quote's symbol and timestamp, or a rollup's symbol and bucket_start.
+#}
+{% test unique_columns(model, columns) %}
+SELECT
+    {{ columns | join(', ') }},
+    COUNT(*) AS duplicates
+FROM {{ model }}
+GROUP BY {{ columns | join(', ') }}
+HAVING COUNT(*) > 1
+{% endtest %}
@@ -0,0 +1,70 @@
+"""
+One HTTP session shared by the ETL extractors. Connections are kept alive and pooled per host, so
+the calls of a run reuse a few TLS connections. Requests that hit a connection error, a 429 or a
+5xx are retried with exponential backoff and jitter, honouring Retry-After, and every request
+gets API_TIMEOUT unless it passes its own.
+"""
+
+import os
+import threading
+from typing import Optional
+
+import requests  # type: ignore
+from requests.adapters import HTTPAdapter  # type: ignore
+from urllib3.util.retry import Retry
+
+# Hosts kept in the pool, and the most connections open to one host; extra requests wait for a free one.
+API_POOL_HOSTS = 8
+API_POOL_MAXSIZE = int(os.environ.get("API_POOL_MAXSIZE", "8"))
+
+API_RETRIES = int(os.environ.get("API_RETRIES", "4"))
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Waits 0.5s, 1s, 2s, ... between attempts, plus up to API_BACKOFF_JITTER seconds, and never more than 30s.
+API_BACKOFF_FACTOR = 0.5
+API_BACKOFF_JITTER = 0.5
+API_BACKOFF_MAX = 30
+
+# Seconds to connect and to wait for a response.
+API_TIMEOUT = (3.05, float(os.environ.get("API_TIMEOUT", "20")))
+
+
+class APISession(requests.Session):
+	def request(self, method, url, **kwargs):
+		kwargs.setdefault("timeout", API_TIMEOUT)
+		return super().request(method, url, **kwargs)
+
+
+def create_session() -> APISession:
+	retry = Retry(
+		total=API_RETRIES,
+		status_forcelist=RETRY_STATUSES,
+		backoff_factor=API_BACKOFF_FACTOR,
+		backoff_jitter=API_BACKOFF_JITTER,
+		backoff_max=API_BACKOFF_MAX,
+		respect_retry_after_header=True,
+		# The last response is returned once retries run out, so callers see the API's error body.
+		raise_on_status=False,
+	)
+	adapter = HTTPAdapter(
+		pool_connections=API_POOL_HOSTS, pool_maxsize=API_POOL_MAXSIZE, pool_block=True, max_retries=retry
+	)
+
+	session = APISession()
+	session.mount("https://", adapter)
+	session.mount("http://", adapter)
+	return session
+
+
+_session: Optional[APISession] = None
+_lock = threading.Lock()
+
+
+def get_session() -> APISession:
+	"""Returns the process-wide API session, creating it on first use."""
+
+	global _session
+	with _lock:
+		if _session is None:
+			_session = create_session()
+
+	return _session
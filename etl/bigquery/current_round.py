@@ -1,40 +1,35 @@
 import os
 
 import pandas as pd
-import requests  # type: ignore
 
-import google.auth
-from google.cloud import secretmanager, bigquery
 from pandas import DataFrame
 
+from shared.clients import get_bigquery_client
+from shared.secret_provider import get_secret
+from etl.api_client import get_session
+from etl.manifest import write_manifest
+
 PROJECT_ID = "cloud-data-infrastructure"
 os.environ["GCLOUD_PROJECT"] = PROJECT_ID
-credentials, project_id = google.auth.default()
 
 
 class DataRetrieval:
 	def __init__(self, project_id):
 		self.project_id = project_id
 
-	def _get_rapid_api_key(self) -> str:
-		client = secretmanager.SecretManagerServiceClient()
-		name = f"projects/{self.project_id}/secrets/rapid-api/versions/1"
-		response = client.access_secret_version(request={"name": name})
-		return response.payload.data.decode("UTF-8")
-
 	def _call_api(self) -> str:
-		payload = self._get_rapid_api_key()
+		payload = get_secret("rapid-api", project=self.project_id)
 		headers = {
 			"X-RapidAPI-Key": payload,
 			"X-RapidAPI-Host": "api-football-v1.p.rapidapi.com",
 		}
 		url = "https://api-football-v1.p.rapidapi.com/v3/fixtures/rounds"
 		querystring = {"league": "39", "season": "2023", "current": "true"}
-		response = requests.get(url, headers=headers, params=querystring, timeout=10)
+		response = get_session().get(url, headers=headers, params=querystring)
 		return response.json()["response"][0]
 
 	def _call_bigquery(self) -> int:
-		client = bigquery.Client()
+		client = get_bigquery_client()
 		query = f"""
             SELECT CONCAT(season, " - ", MAX(round)) AS max_round
             FROM `{self.project_id}.premier_league_dataset.current_round`
@@ -97,6 +92,8 @@ def load_current_round() -> None:
 				table_schema=schema_definition,
 			)
 
+			write_manifest("current_round", current_round_dataframe)
+
 			print(f"Current round: {round_number_int} loaded!")
 
 		current_round_dataframe = create_dataframe()
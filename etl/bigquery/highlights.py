@@ -4,28 +4,19 @@ highlights and loads it into a BigQuery table.
 """
 
 import googleapiclient.discovery
-from google.cloud import secretmanager
 from datetime import datetime, timedelta, timezone
 
 import pandas as pd
 from pandas import DataFrame
 
-
-def gcp_secret_rapid_api() -> str:
-	"""This function retrieves the Rapid API key from GCP Secret Manager"""
-
-	client = secretmanager.SecretManagerServiceClient()
-	name = "projects/463690670206/secrets/youtube-api/versions/1"
-	response = client.access_secret_version(request={"name": name})
-	youtube_api_key = response.payload.data.decode("UTF-8")
-
-	return youtube_api_key
+from shared.secret_provider import get_secret
+from etl.manifest import write_manifest
 
 
 def call_api(part, channel_id, max_results, query, publishedAfter) -> list:
 	"""This function calls the API then returns a list with the YouTube data"""
 
-	youtube_api_key = gcp_secret_rapid_api()
+	youtube_api_key = get_secret("youtube-api")
 
 	# Initialize YouTube Data API v3 service
 	youtube = googleapiclient.discovery.build(
@@ -121,6 +112,8 @@ def send_dataframe_to_bigquery(
 		table_schema=schema_definition,
 	)
 
+	write_manifest("highlights", highlights_dataframe)
+
 	print("Highlights table loaded!")
 
 
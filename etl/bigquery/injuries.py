@@ -2,27 +2,21 @@ import os
 
 from datetime import datetime
 import pandas as pd
-import requests  # type: ignore
-from google.cloud import bigquery, secretmanager
 from pandas import DataFrame
 
+from shared.clients import get_bigquery_client
+from shared.secret_provider import get_secret
+from etl.api_client import get_session
+from etl.manifest import write_manifest
+
 os.environ["GCLOUD_PROJECT"] = "cloud-data-infrastructure"
 
 STANDINGS_TABLE = "premier_league_dataset.standings"
 
 
-def gcp_secret_rapid_api() -> str:
-	client = secretmanager.SecretManagerServiceClient()
-	name = "projects/463690670206/secrets/rapid-api/versions/1"
-	response = client.access_secret_version(request={"name": name})
-	rapid_api_key = response.payload.data.decode("UTF-8")
-
-	return rapid_api_key
-
-
 # Calling the Standings table from BigQuery to get each team's id.
 def bigquery_call() -> DataFrame:
-	bqclient = bigquery.Client()
+	bqclient = get_bigquery_client()
 
 	query_string = f"""
         SELECT *
@@ -42,7 +36,7 @@ def bigquery_call() -> DataFrame:
 
 
 def get_teams_with_injuries() -> list:
-	rapid_api_key = gcp_secret_rapid_api()
+	rapid_api_key = get_secret("rapid-api")
 	bigquery_dataframe = bigquery_call()
 
 	id_list = [bigquery_dataframe.iloc[i, 0] for i in range(20)]
@@ -61,7 +55,7 @@ def get_teams_with_injuries() -> list:
 
 		query = {"league": "39", "season": "2023", "team": id, "date": formatted_date}
 
-		response = requests.get(url, headers=headers, params=query, timeout=10)
+		response = get_session().get(url, headers=headers, params=query)
 		json_res = response.json()
 
 		if json_res["response"] == []:
@@ -73,7 +67,7 @@ def get_teams_with_injuries() -> list:
 
 
 def call_api():
-	rapid_api_key = gcp_secret_rapid_api()
+	rapid_api_key = get_secret("rapid-api")
 	injuried_teams_list = get_teams_with_injuries()
 
 	headers = {
@@ -82,6 +76,7 @@ def call_api():
 	}
 
 	url = "https://api-football-v1.p.rapidapi.com/v3/injuries"
+	injury_dataframes = []
 
 	for id in injuried_teams_list:
 		team_id_list = []
@@ -97,7 +92,7 @@ def call_api():
 
 		query = {"league": "39", "season": "2023", "team": id, "date": formatted_date}
 
-		response = requests.get(url, headers=headers, params=query, timeout=10)
+		response = get_session().get(url, headers=headers, params=query)
 		json_res = response.json()
 
 		response_length = len(json_res["response"])
@@ -162,6 +157,11 @@ def call_api():
 
 		print(f"{team_name_list[0]}'s injuries table loaded!")
 
+		injury_dataframes.append(df)
+
+	if injury_dataframes:
+		write_manifest("injuries", pd.concat(injury_dataframes, ignore_index=True))
+
 
 if __name__ != "__main__":
 	call_api()
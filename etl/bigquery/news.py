@@ -2,24 +2,17 @@ import os
 from datetime import datetime
 from datetime import timedelta as td
 
-import requests  # type: ignore
-from google.cloud import secretmanager
 from pandas import DataFrame
 
-os.environ["GCLOUD_PROJECT"] = "cloud-data-infrastructure"
-
-
-def gcp_secret_news_api() -> str:
-	client = secretmanager.SecretManagerServiceClient()
-	name = "projects/463690670206/secrets/news-api/versions/1"
-	response = client.access_secret_version(request={"name": name})
-	news_api_key = response.payload.data.decode("UTF-8")
+from shared.secret_provider import get_secret
+from etl.api_client import get_session
+from etl.manifest import write_manifest
 
-	return news_api_key
+os.environ["GCLOUD_PROJECT"] = "cloud-data-infrastructure"
 
 
 def call_api() -> tuple[list[str], list[str], list[str], list[str]]:
-	news_api_key = gcp_secret_news_api()
+	news_api_key = get_secret("news-api")
 
 	# Getting yesterday's date.
 	yesteryday = datetime.now() - td(days=1)
@@ -35,7 +28,7 @@ def call_api() -> tuple[list[str], list[str], list[str], list[str]]:
 		f"apiKey={news_api_key}"
 	)
 
-	response = requests.request("GET", url, timeout=20)
+	response = get_session().get(url)
 	json_res = response.json()
 
 	title_list = []
@@ -89,6 +82,8 @@ def send_dataframe_to_bigquery(
 		table_schema=schema_definition,
 	)
 
+	write_manifest("news", standings_dataframe)
+
 	print("News table loaded!")
 
 
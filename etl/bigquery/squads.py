@@ -1,27 +1,21 @@
 import os
 
 import pandas as pd
-import requests  # type: ignore
-from google.cloud import bigquery, secretmanager
 from pandas import DataFrame
 
+from shared.clients import get_bigquery_client
+from shared.secret_provider import get_secret
+from etl.api_client import get_session
+from etl.manifest import write_manifest
+
 os.environ["GCLOUD_PROJECT"] = "cloud-data-infrastructure"
 
 STANDINGS_TABLE = "premier_league_dataset.standings"
 
 
-def gcp_secret_rapid_api() -> str:
-	client = secretmanager.SecretManagerServiceClient()
-	name = "projects/463690670206/secrets/rapid-api/versions/1"
-	response = client.access_secret_version(request={"name": name})
-	rapid_api_key = response.payload.data.decode("UTF-8")
-
-	return rapid_api_key
-
-
 # Calling the Standings table from BigQuery to get each team's id.
 def bigquery_call() -> DataFrame:
-	bqclient = bigquery.Client()
+	bqclient = get_bigquery_client()
 
 	query_string = f"""
         SELECT team_id
@@ -41,7 +35,7 @@ def bigquery_call() -> DataFrame:
 
 
 def call_api() -> None:
-	rapid_api_key = gcp_secret_rapid_api()
+	rapid_api_key = get_secret("rapid-api")
 	bigquery_dataframe = bigquery_call()
 
 	# Iterate through bigquery_dataframe to get the team's id and create a list using list comprehension.
@@ -54,6 +48,8 @@ def call_api() -> None:
 
 	url = "https://api-football-v1.p.rapidapi.com/v3/players/squads"
 
+	squad_dataframes = []
+
 	outer_count = 0
 	while outer_count < 20:
 		team_id_list = []
@@ -67,7 +63,7 @@ def call_api() -> None:
 
 		query = {"team": id_list[outer_count]}
 
-		response = requests.get(url, headers=headers, params=query, timeout=10)
+		response = get_session().get(url, headers=headers, params=query)
 		json_res = response.json()
 
 		players_length = len(response.json()["response"][0]["players"])
@@ -149,8 +145,11 @@ def call_api() -> None:
 
 		print(f"{team_name_list[0]}'s squad table loaded!")
 
+		squad_dataframes.append(df)
 		outer_count += 1
 
+	write_manifest("squads", pd.concat(squad_dataframes, ignore_index=True))
+
 
 if __name__ != "__main__":
 	call_api()
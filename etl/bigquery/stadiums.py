@@ -9,45 +9,26 @@ import os
 from typing import Dict, Optional
 
 import pandas as pd
-import requests  # type: ignore
 
 # Importing needed libraries.
-from google.cloud import secretmanager
 from pandas import DataFrame
 from sqlalchemy import create_engine  # type: ignore
 from sqlalchemy.types import DECIMAL, String  # type: ignore
 
+from shared.secret_provider import get_secret
+from etl.api_client import get_session
+
 # Settings the project environment.
 os.environ["GCLOUD_PROJECT"] = "cloud-data-infrastructure"
 
 
-def gcp_secret_rapid_api():
-    """Fetching RapidAPI key from Secret Manager"""
-
-    client = secretmanager.SecretManagerServiceClient()
-    name = "projects/463690670206/secrets/go-api/versions/1"
-    response = client.access_secret_version(request={"name": name})
-    go_api_key = response.payload.data.decode("UTF-8")
-
-    return go_api_key
-
-
-def gcp_secret_database_uri():
-    client = secretmanager.SecretManagerServiceClient()
-    name = "projects/463690670206/secrets/premier-league-database-connection-uri/versions/3"
-    response = client.access_secret_version(request={"name": name})
-    database_uri = response.payload.data.decode("UTF-8")
-
-    return database_uri
-
-
 def call_api():
     """Calling the API then filling in the empty lists"""
 
-    go_api_key = gcp_secret_rapid_api()
+    go_api_key = get_secret("go-api")
 
     # Building GET request to retrieve data.
-    response = requests.request("GET", go_api_key, timeout=20)
+    response = get_session().get(go_api_key)
     json_res = response.json()
 
     # Empty lists that will be filled and then used to create a dataframe.
@@ -156,7 +137,7 @@ def send_dataframe_to_postgresql(
 
 
 if __name__ != "__main__":
-    database_uri = gcp_secret_database_uri()
+    database_uri = get_secret("premier-league-database-connection-uri", version="3")
     schema_name = "premier-league-schema"
     table_name = "stadiums"
     df = create_dataframe()
@@ -2,20 +2,13 @@ import json
 import os
 
 import pandas as pd
-import requests  # type: ignore
-from google.cloud import secretmanager
 from pandas import DataFrame
 
-os.environ["GCLOUD_PROJECT"] = "cloud-data-infrastructure"
-
-
-def gcp_secret_rapid_api() -> str:
-	client = secretmanager.SecretManagerServiceClient()
-	name = "projects/463690670206/secrets/rapid-api/versions/1"
-	response = client.access_secret_version(request={"name": name})
-	rapid_api_key = response.payload.data.decode("UTF-8")
+from shared.secret_provider import get_secret
+from etl.api_client import get_session
+from etl.manifest import write_manifest
 
-	return rapid_api_key
+os.environ["GCLOUD_PROJECT"] = "cloud-data-infrastructure"
 
 
 def call_api() -> (
@@ -34,7 +27,7 @@ def call_api() -> (
 		list[int],
 	]
 ):
-	payload = gcp_secret_rapid_api()
+	payload = get_secret("rapid-api")
 
 	headers = {
 		"X-RapidAPI-Key": payload,
@@ -44,7 +37,7 @@ def call_api() -> (
 	url = "https://api-football-v1.p.rapidapi.com/v3/standings"
 
 	query = {"season": "2023", "league": "39"}
-	response = requests.get(url, headers=headers, params=query, timeout=10)
+	response = get_session().get(url, headers=headers, params=query)
 	json_res = response.json()
 
 	team_id_list = []
@@ -184,6 +177,8 @@ def send_dataframe_to_bigquery(standings_dataframe: DataFrame, schema_definition
 		table_schema=schema_definition,
 	)
 
+	write_manifest("standings", standings_dataframe)
+
 	print("Standings table loaded!")
 
 
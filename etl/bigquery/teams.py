@@ -1,28 +1,22 @@
 import os
 
 import pandas as pd
-import requests  # type: ignore
-from google.cloud import bigquery, secretmanager
 from pandas import DataFrame
 
+from shared.clients import get_bigquery_client
+from shared.secret_provider import get_secret
+from etl.api_client import get_session
+from etl.manifest import write_manifest
+
 os.environ["GCLOUD_PROJECT"] = "cloud-data-infrastructure"
 
 STANDINGS_TABLE = "premier_league_dataset.standings"
 TEAMS_TABLE = "premier_league_dataset.teams"
 
 
-def gcp_secret_rapid_api() -> str:
-	client = secretmanager.SecretManagerServiceClient()
-	name = "projects/463690670206/secrets/rapid-api/versions/1"
-	response = client.access_secret_version(request={"name": name})
-	rapid_api_key = response.payload.data.decode("UTF-8")
-
-	return rapid_api_key
-
-
 # Calling the Standings table from BigQuery to get each team's id.
 def bigquery_call() -> DataFrame:
-	bqclient = bigquery.Client()
+	bqclient = get_bigquery_client()
 
 	query_string = f"""
         SELECT *
@@ -54,7 +48,7 @@ def call_api() -> (
 		list[int],
 	]
 ):
-	rapid_api_key = gcp_secret_rapid_api()
+	rapid_api_key = get_secret("rapid-api")
 	bigquery_dataframe = bigquery_call()
 
 	# Iterate through bigquery_dataframe to get the team's id and create a list using list comprehension.
@@ -80,7 +74,7 @@ def call_api() -> (
 	count = 0
 	while count < 20:
 		query = {"league": "39", "season": "2023", "team": id_list[count]}
-		response = requests.get(url, headers=headers, params=query, timeout=10)
+		response = get_session().get(url, headers=headers, params=query)
 		json_res = response.json()
 
 		team_id_list.append(int(json_res["response"]["team"]["id"]))
@@ -182,6 +176,8 @@ def send_dataframe_to_bigquery(standings_dataframe: DataFrame, schema_definition
 		table_schema=schema_definition,
 	)
 
+	write_manifest("teams", teams_dataframe)
+
 	print("Teams table loaded!")
 
 
@@ -2,24 +2,17 @@ import json
 import os
 
 import pandas as pd
-import requests  # type: ignore
-from google.cloud import secretmanager
 from pandas import DataFrame
 
-os.environ["GCLOUD_PROJECT"] = "cloud-data-infrastructure"
-
-
-def gcp_secret_rapid_api() -> str:
-	client = secretmanager.SecretManagerServiceClient()
-	name = "projects/463690670206/secrets/rapid-api/versions/1"
-	response = client.access_secret_version(request={"name": name})
-	rapid_api_key = response.payload.data.decode("UTF-8")
+from shared.secret_provider import get_secret
+from etl.api_client import get_session
+from etl.manifest import write_manifest
 
-	return rapid_api_key
+os.environ["GCLOUD_PROJECT"] = "cloud-data-infrastructure"
 
 
 def call_api() -> tuple[list[str], list[int], list[str], list[int], list[str], list[str]]:
-	rapid_api_key = gcp_secret_rapid_api()
+	rapid_api_key = get_secret("rapid-api")
 	headers = {
 		"X-RapidAPI-Key": rapid_api_key,
 		"X-RapidAPI-Host": "api-football-v1.p.rapidapi.com",
@@ -28,7 +21,7 @@ def call_api() -> tuple[list[str], list[int], list[str], list[int], list[str], l
 	url = "https://api-football-v1.p.rapidapi.com/v3/players/topscorers"
 
 	query = {"league": "39", "season": "2023"}
-	response = requests.get(url, headers=headers, params=query, timeout=10)
+	response = get_session().get(url, headers=headers, params=query)
 	json_res = response.json()
 
 	full_name_list = []
@@ -138,6 +131,8 @@ def send_dataframe_to_bigquery(standings_dataframe: DataFrame, schema_definition
 		table_schema=schema_definition,
 	)
 
+	write_manifest("top_scorers", top_scorers_dataframe)
+
 	print("Top Scorers table loaded!")
 
 
@@ -6,25 +6,26 @@ and load the collection and documents into Firestore.
 # System libraries
 import os
 
+# Display fields and secrets shared with the Streamlit dashboard.
+from shared.formatting import fixture_display_fields
+from shared.secret_provider import get_secret
+from etl.api_client import get_session
+
 # Google Cloud library imports.
-from google.cloud import secretmanager
 from firebase_admin import firestore
 import firebase_admin
-import requests
 
 # Settings the project environment.
 os.environ["GCLOUD_PROJECT"] = "cloud-data-infrastructure"
 
 
-def call_api(secret_name):
+def call_api(secret_id):
     """
     This function fetches the RapidAPI key from Secret Manager and
     and sets up the headers for an API call.
     """
 
-    client = secretmanager.SecretManagerServiceClient()
-    response = client.access_secret_version(request={"name": secret_name})
-    payload = response.payload.data.decode("UTF-8")
+    payload = get_secret(secret_id)
 
     # Headers used for RapidAPI.
     headers = {
@@ -39,20 +40,32 @@ def call_api(secret_name):
 class Fixture:
     """Building JSON structure for documents."""
 
-    def __init__(self, date, teams, goals=None):
+    def __init__(self, date, teams, goals=None, status=None):
         self.date = date
         self.teams = teams
         self.goals = goals
+        self.status = status
 
     def __repr__(self):
         return f"Fixture(\
                 name={self.date}, \
                 country={self.teams}, \
-                goals={self.goals}\
+                goals={self.goals}, \
+                status={self.status}\
             )"
 
     def to_dict(self):
-        return {"date": self.date, "teams": self.teams, "goals": self.goals}
+        fixture = {
+            "date": self.date,
+            "teams": self.teams,
+            "goals": self.goals,
+            "status": self.status,
+        }
+
+        # Ready-to-render fields so the dashboard doesn't parse dates or nested dicts.
+        fixture.update(fixture_display_fields(fixture))
+
+        return fixture
 
 
 def get_current_round():
@@ -62,11 +75,11 @@ def get_current_round():
     in the next function to pull correct round.
     """
 
-    headers = call_api("projects/463690670206/secrets/rapid-api/versions/1")
+    headers = call_api("rapid-api")
 
     url = "https://api-football-v1.p.rapidapi.com/v3/fixtures/rounds"
     querystring = {"league": "39", "season": "2023", "current": "true"}
-    response = requests.get(url, headers=headers, params=querystring, timeout=20)
+    response = get_session().get(url, headers=headers, params=querystring)
 
     current_round_response = response.json()["response"][0]
     # example response: "Regular Season - 12"
@@ -77,14 +90,12 @@ def get_current_round():
 def retrieve_data_for_current_round():
     """Retrieving the data for the current round based on get_current_round() function's response"""
 
-    headers = call_api("projects/463690670206/secrets/rapid-api/versions/1")
+    headers = call_api("rapid-api")
     current_round_response = get_current_round()
 
     url = "https://api-football-v1.p.rapidapi.com/v3/fixtures"
     querystring = {"league": "39", "season": "2023", "round": current_round_response}
-    build_current_response = requests.get(
-        url, headers=headers, params=querystring, timeout=20
-    )
+    build_current_response = get_session().get(url, headers=headers, params=querystring)
 
     return build_current_response
 
@@ -109,6 +120,11 @@ def load_firestore():
         teams_dict = build_current_response.json()["response"][count]["teams"]
         goal_dict = build_current_response.json()["response"][count]["goals"]
 
+        # Short match status, e.g. "FT" once the match is over.
+        status = build_current_response.json()["response"][count]["fixture"]["status"][
+            "short"
+        ]
+
         # Calling the away and home team names to build document name.
         away_team = build_current_response.json()["response"][count]["teams"]["away"][
             "name"
@@ -117,7 +133,9 @@ def load_firestore():
             "name"
         ]
 
-        fixture = Fixture(date=(fixture_date), teams=teams_dict, goals=goal_dict)
+        fixture = Fixture(
+            date=(fixture_date), teams=teams_dict, goals=goal_dict, status=status
+        )
 
         db.collection(f"{current_round_response}").document(
             f"{away_team} vs {home_team}"
@@ -0,0 +1,39 @@
+"""
+This file records when each table was loaded, along with a hash of its contents,
+in a Firestore document that the Streamlit dashboard polls to know which cached
+datasets are stale.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+
+import firebase_admin  # type: ignore
+import pandas as pd
+from firebase_admin import firestore  # type: ignore
+from pandas import DataFrame
+
+MANIFEST_COLLECTION = "dashboard"
+MANIFEST_DOCUMENT = "manifest"
+
+
+def content_hash(df: DataFrame) -> str:
+	"""This function hashes the column names and values of a dataframe"""
+
+	digest = hashlib.sha256(",".join(map(str, df.columns)).encode("UTF-8"))
+	digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+
+	return digest.hexdigest()
+
+
+def write_manifest(table: str, df: DataFrame) -> None:
+	"""This function records the load time and content hash of a table in the manifest"""
+
+	# Check to see if firebase app has been initialized.
+	if not firebase_admin._apps:
+		firebase_admin.initialize_app()
+	db = firestore.client()
+
+	entry = {"loaded_at": datetime.now(timezone.utc), "content_hash": content_hash(df)}
+	db.collection(MANIFEST_COLLECTION).document(MANIFEST_DOCUMENT).set({table: entry}, merge=True)
+
+	print(f"Manifest updated for {table}!")
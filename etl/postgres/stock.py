@@ -1,50 +1,495 @@
+"""
+Loads quotes for STOCK_TICKERS (Manchester United by default) into the `stocks` table, which is
+range partitioned by New York trading day on the quote's epoch `timestamp`, with an index on
+`timestamp`. Reads of a day or a time range only touch the partitions they cover. Each load can also
+drop partitions older than STOCK_RETENTION_DAYS, and compact those older than
+STOCK_COMPACT_AFTER_DAYS to each ticker's last quote of every minute. Both are off (0, keeping every
+quote) unless set, and skipped on the run that moves an unpartitioned table's rows into partitions.
+
+Datastream replicates `stocks` into BigQuery's `public_stocks`. The partitioned table is published with
+`publish_via_partition_root`, so its partitions' changes replicate as changes to `stocks`. Creating it
+adds it to STOCK_PUBLICATION and to every publication that published the unpartitioned table.
+
+The tickers are fetched concurrently over the ETL's pooled HTTP session and written in a single bulk
+insert, so each extra ticker adds little to a run.
+
+The Prefect flow loads one round of quotes with `send_dataframe_to_postgres`. Running the module streams instead:
+    python -m etl.postgres.stock
+polls every STREAM_POLL_SECONDS during market hours and writes the new quotes with COPY in
+micro-batches, until SIGTERM or SIGINT, which flush what is buffered before exiting. A failed poll is
+logged and the next one goes ahead, and a failed write is retried with backoff while polling waits on
+the full queue. After a stop signal, the last batches get STREAM_STOP_RETRIES attempts, and the stream
+exits with status 1 if they all fail. If the poller stops without a signal, the stream exits with status 1.
+"""
+
+import io
 import os
+import queue
+import signal
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from time import monotonic, sleep
+from typing import Dict, Iterable, List, Optional
 
 import polars as pl
-import requests  # type: ignore
-from google.cloud import secretmanager
+from sqlalchemy import column, create_engine, insert, table, text
+from sqlalchemy.engine import Connection, Engine
+
+from shared.secret_provider import get_secret
+from etl.api_client import get_session
+from etl.postgres.stock_partitions import NEW_YORK, STOCK_TABLE, day_bounds, partition_day, partition_name, trading_day
 
 # Settings the project environment.
 os.environ["GCLOUD_PROJECT"] = "cloud-data-infrastructure"
 
+QUOTE_URL = "https://financialmodelingprep.com/api/v3/quote/{ticker}"
 
-def gcp_secret_stock_api() -> str:
-	"""This function retrieves the Rapid API key from GCP Secret Manager"""
+# Comma separated, e.g. "MANU,JUVE.MI,BVB.DE,^GSPC". The dashboard charts MANU.
+STOCK_TICKERS = [ticker.strip() for ticker in os.environ.get("STOCK_TICKERS", "MANU").split(",") if ticker.strip()]
+STOCK_MAX_WORKERS = int(os.environ.get("STOCK_MAX_WORKERS", "8"))
 
-	client = secretmanager.SecretManagerServiceClient()
-	name = "projects/463690670206/secrets/stock-api/versions/1"
-	response = client.access_secret_version(request={"name": name})
-	stock_api_key = response.payload.data.decode("UTF-8")
+# The Datastream stream's publication.
+STOCK_PUBLICATION = os.environ.get("STOCK_PUBLICATION", "")
 
-	return stock_api_key
+# Days of quotes to keep, and after how many days to compact them; 0 keeps every quote forever.
+STOCK_RETENTION_DAYS = int(os.environ.get("STOCK_RETENTION_DAYS", "0"))
+STOCK_COMPACT_AFTER_DAYS = int(os.environ.get("STOCK_COMPACT_AFTER_DAYS", "0"))
 
+STREAM_POLL_SECONDS = float(os.environ.get("STREAM_POLL_SECONDS", "15"))
+STREAM_BATCH_ROWS = int(os.environ.get("STREAM_BATCH_ROWS", "500"))
+STREAM_FLUSH_SECONDS = float(os.environ.get("STREAM_FLUSH_SECONDS", "60"))
+# Polled batches waiting to be written; polling blocks while this many are queued.
+STREAM_QUEUE_SIZE = int(os.environ.get("STREAM_QUEUE_SIZE", "240"))
+# A failed write is retried after 5s, 10s, 20s, ..., and never more than 5 minutes.
+STREAM_RETRY_SECONDS = 5
+STREAM_RETRY_MAX_SECONDS = 300
+# Writes attempted after a stop signal before the stream gives up and exits.
+STREAM_STOP_RETRIES = 3
+MARKET_OPEN = time(9, 30)
+MARKET_CLOSE = time(16)
 
-def gcp_secret_postgresql_uri() -> str:
-	"""This function retrieves the Rapid API key from GCP Secret Manager"""
+# Compacted partitions are marked with this table comment so they are only compacted once.
+COMPACTED = "compacted"
 
-	client = secretmanager.SecretManagerServiceClient()
-	name = "projects/463690670206/secrets/postgresql-uri/versions/1"
-	response = client.access_secret_version(request={"name": name})
-	postgresql_uri = response.payload.data.decode("UTF-8")
+# The quote endpoint's fields, as the table first created from its response stored them.
+STOCK_COLUMNS = {
+	"symbol": "TEXT",
+	"name": "TEXT",
+	"price": "DOUBLE PRECISION",
+	"changesPercentage": "DOUBLE PRECISION",
+	"change": "DOUBLE PRECISION",
+	"dayLow": "DOUBLE PRECISION",
+	"dayHigh": "DOUBLE PRECISION",
+	"yearHigh": "DOUBLE PRECISION",
+	"yearLow": "DOUBLE PRECISION",
+	"marketCap": "BIGINT",
+	"priceAvg50": "DOUBLE PRECISION",
+	"priceAvg200": "DOUBLE PRECISION",
+	"exchange": "TEXT",
+	"volume": "BIGINT",
+	"avgVolume": "BIGINT",
+	"open": "DOUBLE PRECISION",
+	"previousClose": "DOUBLE PRECISION",
+	"eps": "DOUBLE PRECISION",
+	"pe": "DOUBLE PRECISION",
+	"earningsAnnouncement": "TEXT",
+	"sharesOutstanding": "BIGINT",
+	"timestamp": "BIGINT NOT NULL",
+}
+POLARS_TYPES = {"TEXT": pl.Utf8, "DOUBLE": pl.Float64, "BIGINT": pl.Int64}
 
-	return postgresql_uri
 
+def create_partitions(connection: Connection, days: Iterable[date]) -> None:
+	for day in sorted(set(days)):
+		start, end = day_bounds(day)
+		connection.execute(
+			text(
+				f'CREATE TABLE IF NOT EXISTS "{partition_name(day)}" '
+				f'PARTITION OF "{STOCK_TABLE}" FOR VALUES FROM ({start}) TO ({end})'
+			)
+		)
+
+
+def partitions(connection: Connection) -> Dict[date, str]:
+	"""Returns the table's trading day partitions by day; others, like a default partition, are left alone."""
+
+	rows = connection.execute(
+		text(
+			"SELECT child.relname FROM pg_inherits "
+			"JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+			"WHERE pg_inherits.inhparent = to_regclass(:table)"
+		),
+		{"table": STOCK_TABLE},
+	)
+	days = {name: partition_day(name) for (name,) in rows}
+	return {day: name for name, day in days.items() if day is not None}
+
+
+def stock_publications(connection: Connection) -> List[str]:
+	"""Returns the publications that publish the table."""
+
+	rows = connection.execute(
+		text(
+			"SELECT pubname FROM pg_publication WHERE puballtables "
+			"OR oid IN (SELECT prpubid FROM pg_publication_rel WHERE prrelid = to_regclass(:table))"
+		),
+		{"table": STOCK_TABLE},
+	)
+	return [name for (name,) in rows]
+
+
+def publish_stock_table(connection: Connection, publications: Iterable[str]) -> None:
+	"""Adds the partitioned table to the publications, publishing its partitions' changes as the table's own."""
+
+	for publication in publications:
+		all_tables, via_root, published = connection.execute(
+			text(
+				"SELECT puballtables, pubviaroot, EXISTS (SELECT FROM pg_publication_rel "
+				"WHERE prpubid = pg_publication.oid AND prrelid = to_regclass(:table)) "
+				"FROM pg_publication WHERE pubname = :publication"
+			),
+			{"table": STOCK_TABLE, "publication": publication},
+		).one()
+		if not via_root:
+			connection.execute(text(f'ALTER PUBLICATION "{publication}" SET (publish_via_partition_root = true)'))
+		if not (all_tables or published):
+			connection.execute(text(f'ALTER PUBLICATION "{publication}" ADD TABLE "{STOCK_TABLE}"'))
+			print(f"Added {STOCK_TABLE} to the {publication} publication!")
+
+
+def create_stock_table(connection: Connection) -> bool:
+	"""
+	Creates the partitioned table, moving the rows of an unpartitioned `stocks` table into it.
+	Returns whether rows were moved.
+	"""
+
+	publications = [STOCK_PUBLICATION] if STOCK_PUBLICATION else []
+	kind: Optional[str] = connection.execute(
+		text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"), {"table": STOCK_TABLE}
+	).scalar()
+	if kind == "p":
+		publish_stock_table(connection, publications)
+		return False
+
+	# Renaming the table keeps it in its publications, so they are looked up first.
+	publications = sorted({*publications, *stock_publications(connection)})
+	legacy_table = f"{STOCK_TABLE}_unpartitioned"
+	if kind is not None:
+		connection.execute(text(f'ALTER TABLE "{STOCK_TABLE}" RENAME TO "{legacy_table}"'))
+		columns = f'(LIKE "{legacy_table}" INCLUDING DEFAULTS)'
+	else:
+		columns = "(" + ", ".join(f'"{column}" {type_}' for column, type_ in STOCK_COLUMNS.items()) + ")"
+
+	connection.execute(text(f'CREATE TABLE "{STOCK_TABLE}" {columns} PARTITION BY RANGE ("timestamp")'))
+	# An index on the parent is created on every partition, including ones added later.
+	connection.execute(text(f'CREATE INDEX "{STOCK_TABLE}_timestamp_index" ON "{STOCK_TABLE}" ("timestamp")'))
+
+	if kind is not None:
+		timestamps = connection.execute(
+			text(f'SELECT DISTINCT "timestamp" / 3600 * 3600 FROM "{legacy_table}" WHERE "timestamp" IS NOT NULL')
+		)
+		create_partitions(connection, (trading_day(timestamp) for (timestamp,) in timestamps))
+		connection.execute(
+			text(f'INSERT INTO "{STOCK_TABLE}" SELECT * FROM "{legacy_table}" WHERE "timestamp" IS NOT NULL')
+		)
+		connection.execute(text(f'DROP TABLE "{legacy_table}"'))
+		print(f"Moved {legacy_table} into the partitioned {STOCK_TABLE} table!")
+
+	# Published after the rows are moved, so Datastream doesn't replicate them a second time.
+	publish_stock_table(connection, publications)
+	return kind is not None
+
+
+def apply_retention(connection: Connection, today: date) -> None:
+	if STOCK_RETENTION_DAYS <= 0:
+		return
+
+	for day, partition in partitions(connection).items():
+		if day < today - timedelta(days=STOCK_RETENTION_DAYS):
+			connection.execute(text(f'DROP TABLE "{partition}"'))
+			print(f"Dropped {partition}!")
+
+
+def compact_partitions(connection: Connection, today: date) -> None:
+	"""Keeps each ticker's last quote of every minute in partitions old enough to compact, then rewrites them in time order."""
+
+	if STOCK_COMPACT_AFTER_DAYS <= 0:
+		return
+
+	for day, partition in partitions(connection).items():
+		if day > today - timedelta(days=STOCK_COMPACT_AFTER_DAYS):
+			continue
+
+		comment = connection.execute(
+			text("SELECT obj_description(to_regclass(:partition), 'pg_class')"), {"partition": partition}
+		).scalar()
+		if comment == COMPACTED:
+			continue
+
+		connection.execute(
+			text(
+				f'DELETE FROM "{partition}" WHERE ctid IN ('
+				f'SELECT ctid FROM (SELECT ctid, ROW_NUMBER() OVER (PARTITION BY "symbol", "timestamp" / 60 '
+				f'ORDER BY "timestamp" DESC) AS position FROM "{partition}") AS ranked WHERE position > 1)'
+			)
+		)
+		index = connection.execute(
+			text("SELECT indexrelid::regclass::text FROM pg_index WHERE indrelid = to_regclass(:partition)"),
+			{"partition": partition},
+		).scalar()
+		connection.execute(text(f'CLUSTER "{partition}" USING {index}'))
+		connection.execute(text(f"COMMENT ON TABLE \"{partition}\" IS '{COMPACTED}'"))
+		print(f"Compacted {partition}!")
+
+
+@lru_cache(maxsize=1)
+def stock_engine() -> Engine:
+	return create_engine(get_secret("postgresql-uri"), pool_pre_ping=True)
 
-def send_dataframe_to_postgres() -> None:
-	stock_api_key = gcp_secret_stock_api()
-	postgresql_uri = gcp_secret_postgresql_uri()
 
-	url = f"https://financialmodelingprep.com/api/v3/quote/MANU?apikey={stock_api_key}"
+def fetch_quote(ticker: str, stock_api_key: str) -> List[dict]:
+	response = get_session().get(QUOTE_URL.format(ticker=ticker), params={"apikey": stock_api_key})
+	response.raise_for_status()
+	quotes = response.json()
+	# Some errors come back with a 200 and a message object instead of a list of quotes.
+	if not isinstance(quotes, list) or not all(isinstance(quote, dict) for quote in quotes):
+		raise ValueError(f"Unexpected quote response: {quotes}")
+	return quotes
 
-	response = requests.request("GET", url)
 
-	json_res = response.json()
-	df = pl.DataFrame(json_res)
+def fetch_quotes(tickers: List[str]) -> pl.DataFrame:
+	"""
+	Fetches every ticker's quote at once and returns them as one frame of the table's columns.
+	A ticker that fails is logged and left out; only every ticker failing raises.
+	"""
 
-	df.write_database(
-		table_name="stocks", connection=postgresql_uri, if_table_exists="append"
+	stock_api_key = get_secret("stock-api")
+	quotes: List[dict] = []
+	failed: List[str] = []
+	with ThreadPoolExecutor(max_workers=min(STOCK_MAX_WORKERS, len(tickers))) as executor:
+		responses = {ticker: executor.submit(fetch_quote, ticker, stock_api_key) for ticker in tickers}
+		for ticker, response in responses.items():
+			try:
+				quotes.extend(response.result())
+			except Exception as error:
+				print(f"Fetching the {ticker} quote failed: {error!r}")
+				failed.append(ticker)
+
+	if len(failed) == len(tickers):
+		raise RuntimeError(f"Fetching quotes failed for {', '.join(failed)}!")
+
+	# Quotes without a symbol or timestamp can't be partitioned or deduplicated.
+	quotes = [quote for quote in quotes if quote.get("symbol") is not None and quote.get("timestamp") is not None]
+	if not quotes:
+		return pl.DataFrame(schema={"symbol": pl.Utf8, "timestamp": pl.Int64})
+
+	df = pl.DataFrame(quotes)
+	# Cast to the table's types, so batches from different polls concatenate and COPY reads integers as such.
+	return df.select(
+		[
+			pl.col(name).cast(POLARS_TYPES[STOCK_COLUMNS[name].split()[0]], strict=False)
+			for name in df.columns
+			if name in STOCK_COLUMNS
+		]
 	)
 
 
-if __name__ != "__main__":
-	send_dataframe_to_postgres()
+def send_dataframe_to_postgres() -> None:
+	df = fetch_quotes(STOCK_TICKERS)
+
+	today = datetime.now(NEW_YORK).date()
+	with stock_engine().begin() as connection:
+		migrated = create_stock_table(connection)
+		create_partitions(connection, [today, *(trading_day(timestamp) for timestamp in df["timestamp"])])
+		# One INSERT statement for every ticker's rows.
+		stocks = table(STOCK_TABLE, *(column(name) for name in df.columns))
+		if len(df):
+			connection.execute(insert(stocks), df.to_dicts())
+		# The moved rows are left as they were until the next run.
+		if not migrated:
+			apply_retention(connection, today)
+			compact_partitions(connection, today)
+
+	print(f"Loaded {len(df)} quotes for {', '.join(STOCK_TICKERS)}!")
+
+
+def copy_quotes(connection: Connection, df: pl.DataFrame) -> None:
+	"""Writes the quotes with COPY, creating the partitions they need first."""
+
+	create_partitions(connection, (trading_day(timestamp) for timestamp in df["timestamp"]))
+	columns = ", ".join(f'"{name}"' for name in df.columns)
+	# Empty CSV fields are read back as NULL.
+	buffer = io.StringIO(df.write_csv(include_header=False))
+	cursor = connection.connection.cursor()
+	cursor.copy_expert(f'COPY "{STOCK_TABLE}" ({columns}) FROM STDIN WITH (FORMAT csv)', buffer)
+
+
+def market_open(now: datetime) -> bool:
+	return now.weekday() < 5 and MARKET_OPEN <= now.time() < MARKET_CLOSE
+
+
+def seconds_until_open(now: datetime) -> float:
+	day = now.date()
+	while True:
+		opening = datetime.combine(day, MARKET_OPEN, NEW_YORK)
+		if opening > now and opening.weekday() < 5:
+			return (opening - now).total_seconds()
+		day += timedelta(days=1)
+
+
+class QuoteStream:
+	"""Polls quotes on a background thread and writes them in micro-batches on the calling thread."""
+
+	def __init__(self, tickers: List[str]):
+		self.tickers = tickers
+		self.batches: "queue.Queue[pl.DataFrame]" = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+		self.stopping = threading.Event()
+		# Batches the poller couldn't queue before a stop signal, written with the final flush.
+		self.unqueued: List[pl.DataFrame] = []
+		self._last_timestamps: Dict[str, int] = {}
+
+	def stop(self, signum: int, frame) -> None:
+		print(f"Received {signal.Signals(signum).name}, flushing and stopping...")
+		self.stopping.set()
+
+	def new_quotes(self, df: pl.DataFrame) -> pl.DataFrame:
+		# A ticker that hasn't traded since the last poll returns the same quote again. Quotes missing
+		# their symbol or timestamp can't be partitioned or deduplicated, so they are skipped.
+		rows = [
+			row
+			for row in df.iter_rows(named=True)
+			if row.get("symbol") is not None
+			and row.get("timestamp") is not None
+			and self._last_timestamps.get(row["symbol"]) != row["timestamp"]
+		]
+		for row in rows:
+			self._last_timestamps[row["symbol"]] = row["timestamp"]
+		return pl.DataFrame(rows, schema=df.schema)
+
+	def poll(self) -> None:
+		while not self.stopping.is_set():
+			now = datetime.now(NEW_YORK)
+			if not market_open(now):
+				self.stopping.wait(seconds_until_open(now))
+				continue
+
+			started = monotonic()
+			try:
+				df = self.new_quotes(fetch_quotes(self.tickers))
+			except Exception as error:
+				# Any failure only loses this poll, e.g. an error body instead of a list of quotes.
+				print(f"Polling quotes failed: {error!r}")
+			else:
+				if len(df):
+					self.enqueue(df)
+			self.stopping.wait(max(STREAM_POLL_SECONDS - (monotonic() - started), 0))
+
+	def enqueue(self, df: pl.DataFrame) -> None:
+		# Waits while the writer is behind, so polling slows down instead of buffering without bound,
+		# but never past a stop signal.
+		while not self.stopping.is_set():
+			try:
+				self.batches.put(df, timeout=1)
+				return
+			except queue.Full:
+				pass
+		self.unqueued.append(df)
+
+	def drain(self) -> List[pl.DataFrame]:
+		batches = []
+		while True:
+			try:
+				batches.append(self.batches.get_nowait())
+			except queue.Empty:
+				return batches + self.unqueued
+
+	def flush(self, pending: List[pl.DataFrame]) -> None:
+		if not pending:
+			return
+
+		df = pl.concat(pending)
+		with stock_engine().begin() as connection:
+			copy_quotes(connection, df)
+		print(f"Copied {len(df)} quotes!")
+
+	def maintain(self, today: date) -> None:
+		# A failure waits for the next day instead of holding up the writes, e.g. CLUSTER not getting its lock.
+		try:
+			with stock_engine().begin() as connection:
+				apply_retention(connection, today)
+				compact_partitions(connection, today)
+		except Exception as error:
+			print(f"Maintaining the stock partitions failed: {error!r}")
+
+	def run(self) -> None:
+		signal.signal(signal.SIGTERM, self.stop)
+		signal.signal(signal.SIGINT, self.stop)
+		with stock_engine().begin() as connection:
+			migrated = create_stock_table(connection)
+
+		poller = threading.Thread(target=self.poll, name="quote-poller", daemon=True)
+		poller.start()
+
+		pending: List[pl.DataFrame] = []
+		rows = 0
+		last_flush = monotonic()
+		failures = 0
+		retry_at = 0.0
+		# The moved rows are left as they were until the next day.
+		maintained: Optional[date] = datetime.now(NEW_YORK).date() if migrated else None
+		# Runs until the poller has stopped and every batch it queued is written, or a write fails after a stop signal.
+		while poller.is_alive() or not self.batches.empty():
+			if monotonic() < retry_at:
+				if self.stopping.is_set():
+					break
+				sleep(min(retry_at - monotonic(), 1))
+				continue
+
+			# While writes fail, batches stay queued, so a full queue blocks polling.
+			if not failures:
+				try:
+					batch = self.batches.get(timeout=1)
+					pending.append(batch)
+					rows += len(batch)
+				except queue.Empty:
+					pass
+
+			if rows >= STREAM_BATCH_ROWS or (pending and monotonic() - last_flush >= STREAM_FLUSH_SECONDS):
+				try:
+					self.flush(pending)
+				except Exception as error:
+					# The pending quotes are kept and written again after the backoff.
+					failures += 1
+					delay = min(STREAM_RETRY_SECONDS * 2 ** (failures - 1), STREAM_RETRY_MAX_SECONDS)
+					print(f"Writing quotes failed, retrying in {delay:.0f}s: {error!r}")
+					retry_at = monotonic() + delay
+				else:
+					pending, rows, last_flush, failures = [], 0, monotonic(), 0
+
+			today = datetime.now(NEW_YORK).date()
+			if maintained != today:
+				self.maintain(today)
+				maintained = today
+
+		poller.join(timeout=STREAM_POLL_SECONDS)
+		pending.extend(self.drain())
+		for attempt in range(1, STREAM_STOP_RETRIES + 1):
+			try:
+				self.flush(pending)
+				break
+			except Exception as error:
+				print(f"Writing quotes failed ({attempt} of {STREAM_STOP_RETRIES}): {error!r}")
+				if attempt < STREAM_STOP_RETRIES:
+					sleep(min(STREAM_RETRY_SECONDS * 2 ** (attempt - 1), STREAM_RETRY_MAX_SECONDS))
+		else:
+			sys.exit(f"Stopped without writing {sum(len(df) for df in pending)} quotes!")
+
+		if not self.stopping.is_set():
+			sys.exit("The quote poller stopped unexpectedly!")
+
+
+if __name__ == "__main__":
+	QuoteStream(STOCK_TICKERS).run()
@@ -0,0 +1,39 @@
+"""The New York trading days that the `stocks` table is partitioned by, and the partition covering each."""
+
+import re
+from datetime import date, datetime, time, timedelta
+from typing import Optional, Tuple
+from zoneinfo import ZoneInfo
+
+STOCK_TABLE = "stocks"
+NEW_YORK = ZoneInfo("America/New_York")
+PARTITION_NAME = re.compile(rf"{STOCK_TABLE}_(\d{{8}})")
+
+
+def trading_day(timestamp: int) -> date:
+	return datetime.fromtimestamp(timestamp, NEW_YORK).date()
+
+
+def day_bounds(day: date) -> Tuple[int, int]:
+	"""Returns the epoch seconds of a New York day's midnight and the next day's."""
+
+	start = datetime.combine(day, time(), NEW_YORK)
+	end = datetime.combine(day + timedelta(days=1), time(), NEW_YORK)
+	return int(start.timestamp()), int(end.timestamp())
+
+
+def partition_name(day: date) -> str:
+	return f"{STOCK_TABLE}_{day:%Y%m%d}"
+
+
+def partition_day(name: str) -> Optional[date]:
+	"""Returns the trading day a partition covers, or `None` for a partition not named after one."""
+
+	match = PARTITION_NAME.fullmatch(name)
+	if match is None:
+		return None
+
+	try:
+		return datetime.strptime(match.group(1), "%Y%m%d").date()
+	except ValueError:
+		return None
@@ -46,6 +46,7 @@ def highlights():
 @task
 def task_stocks():
     from etl.postgres.stock import send_dataframe_to_postgres
+    send_dataframe_to_postgres()
 
 @flow
 def stocks():
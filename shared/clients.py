@@ -0,0 +1,102 @@
+"""
+Process-wide Google Cloud clients. The dashboard and the ETL modules share one set of
+credentials, kept fresh by a background thread, and one BigQuery client per process whose
+HTTP connections are pooled, so a query doesn't pay for auth or TLS setup.
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+import google.auth
+from google.auth import exceptions as auth_exceptions
+from google.auth.credentials import Credentials
+from google.auth.transport.requests import AuthorizedSession, Request
+from google.cloud import bigquery
+from requests.adapters import HTTPAdapter
+
+SCOPES = ["https://www.googleapis.com/auth/cloud-platform"]
+
+# Sized for the dashboard's prefetch thread pool.
+HTTP_POOL_SIZE = 8
+
+# Tokens are refreshed this long before they expire; failed refreshes are retried after RETRY_SECONDS.
+REFRESH_MARGIN_SECONDS = 300
+RETRY_SECONDS = 30
+
+
+class ClientProvider:
+	def __init__(self, pool_size: int = HTTP_POOL_SIZE):
+		self.pool_size = pool_size
+		self._credentials: Optional[Credentials] = None
+		self._project: Optional[str] = None
+		self._bigquery_client: Optional[bigquery.Client] = None
+		self._bigquery_storage_client = None
+		self._lock = threading.RLock()
+
+	def credentials(self) -> Tuple[Credentials, Optional[str]]:
+		with self._lock:
+			if self._credentials is None:
+				self._credentials, self._project = google.auth.default(scopes=SCOPES)
+				self._credentials.refresh(Request())
+				threading.Thread(target=self._refresh_forever, name="credentials-refresh", daemon=True).start()
+
+		return self._credentials, self._project
+
+	def _refresh_forever(self) -> None:
+		while True:
+			# `expiry` is a naive UTC datetime, or None for credentials that don't expire.
+			expiry = self._credentials.expiry  # type: ignore
+			if expiry is None:
+				return
+
+			now = datetime.now(timezone.utc).replace(tzinfo=None)
+			time.sleep(max((expiry - now).total_seconds() - REFRESH_MARGIN_SECONDS, 0))
+			try:
+				with self._lock:
+					self._credentials.refresh(Request())  # type: ignore
+			except auth_exceptions.GoogleAuthError:
+				time.sleep(RETRY_SECONDS)
+
+	def session(self) -> AuthorizedSession:
+		credentials, _ = self.credentials()
+		session = AuthorizedSession(credentials)
+		adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+		session.mount("https://", adapter)
+		return session
+
+	def bigquery_client(self) -> bigquery.Client:
+		with self._lock:
+			if self._bigquery_client is None:
+				credentials, project = self.credentials()
+				self._bigquery_client = bigquery.Client(project=project, credentials=credentials, _http=self.session())
+
+		return self._bigquery_client
+
+	def bigquery_storage_client(self):
+		"""Returns the Storage Read API client used to download large results, sharing one gRPC channel."""
+
+		from google.cloud import bigquery_storage  # type: ignore
+
+		with self._lock:
+			if self._bigquery_storage_client is None:
+				credentials, _ = self.credentials()
+				self._bigquery_storage_client = bigquery_storage.BigQueryReadClient(credentials=credentials)
+
+		return self._bigquery_storage_client
+
+
+provider = ClientProvider()
+
+
+def get_credentials() -> Tuple[Credentials, Optional[str]]:
+	return provider.credentials()
+
+
+def get_bigquery_client() -> bigquery.Client:
+	return provider.bigquery_client()
+
+
+def get_bigquery_storage_client():
+	return provider.bigquery_storage_client()
@@ -0,0 +1,37 @@
+"""Date and fixture formatting shared by the dashboard and the fixtures loader."""
+
+from datetime import datetime
+
+
+def ordinal_suffix(day: int) -> str:
+	if 10 < day % 100 < 20:
+		return "th"
+	return {1: "st", 2: "nd", 3: "rd"}.get(day % 10, "th")
+
+
+def format_date(date: datetime) -> str:
+	"""Formats a date as e.g. 'August 11th, 2023'."""
+
+	return f"{date:%B} {date.day}{ordinal_suffix(date.day)}, {date:%Y}"
+
+
+def format_kickoff(kickoff: datetime) -> str:
+	"""Formats a kickoff time as e.g. 'August 11th, 2023 - 19:00'."""
+
+	return f"{format_date(kickoff)} - {kickoff:%H:%M}"
+
+
+def fixture_display_fields(fixture: dict) -> dict:
+	"""Builds the ready-to-render fields of a fixture document from its `date`, `teams` and `goals`."""
+
+	kickoff = datetime.fromisoformat(fixture["date"])
+	return {
+		"kickoff": format_kickoff(kickoff),
+		"timestamp": int(kickoff.timestamp()),
+		"home_team": fixture["teams"]["home"]["name"],
+		"away_team": fixture["teams"]["away"]["name"],
+		"home_logo": fixture["teams"]["home"]["logo"],
+		"away_logo": fixture["teams"]["away"]["logo"],
+		"home_goals": fixture["goals"]["home"],
+		"away_goals": fixture["goals"]["away"],
+	}
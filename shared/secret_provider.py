@@ -0,0 +1,137 @@
+"""
+Shared access to Secret Manager for the dashboard and the ETL modules. Secrets are kept in
+memory for SECRET_TTL_SECONDS and fetched through one client per process. Setting
+SECRETS_CACHE_DIR and a Fernet key in SECRETS_CACHE_KEY also keeps them encrypted on disk,
+so a restarted process doesn't need Secret Manager until they expire.
+
+To run without Google Cloud, each secret can be stood in for by an environment variable
+named after it (`mapbox-api` -> `MAPBOX_API`) or by a file of the same name in SECRETS_DIR.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+PROJECT_NUMBER = "463690670206"
+
+SECRET_TTL_SECONDS = int(os.environ.get("SECRET_TTL_SECONDS", "3600"))
+SECRETS_DIR = os.environ.get("SECRETS_DIR")
+SECRETS_CACHE_DIR = os.environ.get("SECRETS_CACHE_DIR")
+SECRETS_CACHE_KEY = os.environ.get("SECRETS_CACHE_KEY")
+
+
+def stand_in_name(secret_id: str) -> str:
+	return secret_id.upper().replace("-", "_")
+
+
+class SecretProvider:
+	def __init__(
+		self,
+		ttl: int = SECRET_TTL_SECONDS,
+		stand_in_dir: Optional[str] = SECRETS_DIR,
+		cache_dir: Optional[str] = SECRETS_CACHE_DIR,
+		cache_key: Optional[str] = SECRETS_CACHE_KEY,
+	):
+		self.ttl = ttl
+		self.stand_in_dir = stand_in_dir
+		self.cache_dir = cache_dir if cache_key else None
+		self._fernet = None
+		if self.cache_dir:
+			from cryptography.fernet import Fernet  # type: ignore
+
+			os.makedirs(self.cache_dir, exist_ok=True)
+			self._fernet = Fernet(cache_key)  # type: ignore
+
+		self._client = None
+		self._secrets: Dict[str, Tuple[float, str]] = {}
+		self._lock = threading.Lock()
+
+	@property
+	def client(self):
+		from google.cloud import secretmanager
+
+		from shared.clients import get_credentials
+
+		with self._lock:
+			if self._client is None:
+				credentials, _ = get_credentials()
+				self._client = secretmanager.SecretManagerServiceClient(credentials=credentials)
+
+		return self._client
+
+	def _stand_in(self, secret_id: str, env_var: Optional[str]) -> Optional[str]:
+		for name in (env_var, stand_in_name(secret_id)):
+			if name and name in os.environ:
+				return os.environ[name]
+
+		if self.stand_in_dir:
+			path = os.path.join(self.stand_in_dir, secret_id)
+			if os.path.exists(path):
+				with open(path) as file:
+					return file.read().strip()
+
+		return None
+
+	def _disk_path(self, name: str) -> str:
+		return os.path.join(self.cache_dir, hashlib.sha256(name.encode("UTF-8")).hexdigest())  # type: ignore
+
+	def _read_disk(self, name: str) -> Optional[Tuple[float, str]]:
+		from cryptography.fernet import InvalidToken  # type: ignore
+
+		try:
+			with open(self._disk_path(name), "rb") as file:
+				token = file.read()
+			# Fernet tokens carry their creation time, so expired entries fail to decrypt.
+			value = self._fernet.decrypt(token, ttl=self.ttl).decode("UTF-8")  # type: ignore
+			age = time.time() - self._fernet.extract_timestamp(token)  # type: ignore
+		except (OSError, InvalidToken):
+			return None
+
+		return time.monotonic() + self.ttl - age, value
+
+	def _write_disk(self, name: str, value: str) -> None:
+		path = self._disk_path(name)
+		temporary_path = f"{path}.{threading.get_ident()}.tmp"
+		try:
+			with open(temporary_path, "wb") as file:
+				file.write(self._fernet.encrypt(value.encode("UTF-8")))  # type: ignore
+			os.chmod(temporary_path, 0o600)
+			os.replace(temporary_path, path)
+		except OSError:
+			if os.path.exists(temporary_path):
+				os.remove(temporary_path)
+
+	def get(
+		self, secret_id: str, version: str = "1", project: str = PROJECT_NUMBER, env_var: Optional[str] = None
+	) -> str:
+		"""Returns a secret's value, from a stand-in, the memory or disk cache, or Secret Manager."""
+
+		value = self._stand_in(secret_id, env_var)
+		if value is not None:
+			return value
+
+		name = f"projects/{project}/secrets/{secret_id}/versions/{version}"
+		cached = self._secrets.get(name)
+		if cached is not None and cached[0] > time.monotonic():
+			return cached[1]
+
+		cached = self._read_disk(name) if self.cache_dir else None
+		if cached is None:
+			response = self.client.access_secret_version(request={"name": name})
+			cached = (time.monotonic() + self.ttl, response.payload.data.decode("UTF-8"))
+			if self.cache_dir:
+				self._write_disk(name, cached[1])
+
+		with self._lock:
+			self._secrets[name] = cached
+
+		return cached[1]
+
+
+provider = SecretProvider()
+
+
+def get_secret(secret_id: str, version: str = "1", project: str = PROJECT_NUMBER, env_var: Optional[str] = None) -> str:
+	return provider.get(secret_id, version, project, env_var)
@@ -0,0 +1,38 @@
+"""
+Without Google Cloud credentials, the dashboard tests run on the local backend over a synthetic
+season built in a temporary directory, so `pytest` works offline.
+"""
+
+import os
+import shutil
+import tempfile
+
+import google.auth
+from google.auth.exceptions import DefaultCredentialsError
+
+from benchmarks.make_local_data import make_season
+
+
+def has_gcp_credentials() -> bool:
+	if os.environ.get("GOOGLE_APPLICATION_CREDENTIALS"):
+		return True
+	try:
+		google.auth.default()
+	except DefaultCredentialsError:
+		return False
+	return True
+
+
+def pytest_configure(config):
+	# The test modules read the environment when they are imported, which happens after this hook.
+	if "DASHBOARD_BACKEND" in os.environ or has_gcp_credentials():
+		return
+
+	data_dir = tempfile.mkdtemp(prefix="premier-league-data-")
+	config.add_cleanup(lambda: shutil.rmtree(data_dir, ignore_errors=True))
+	make_season(data_dir)
+
+	os.environ["DASHBOARD_BACKEND"] = "local"
+	os.environ["DASHBOARD_DATA_DIR"] = data_dir
+	os.environ.setdefault("MAPBOX_ACCESS_TOKEN", "offline")
+	os.environ["QUERY_CACHE_DIR"] = os.path.join(data_dir, "query-cache")
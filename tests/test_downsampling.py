@@ -0,0 +1,22 @@
+import numpy as np
+
+from components.downsampling import lttb
+
+
+def test_lttb_keeps_endpoints_and_threshold():
+	rng = np.random.default_rng(39)
+	x = np.arange(10_000, dtype=np.float64)
+	y = rng.normal(size=len(x)).cumsum()
+
+	for threshold in [3, 100, 1000, 9999]:
+		indices = lttb(x, y, threshold)
+		assert len(indices) == threshold
+		assert indices[0] == 0
+		assert indices[-1] == len(x) - 1
+		assert np.all(np.diff(indices) > 0)
+
+
+def test_lttb_returns_every_point_under_threshold():
+	x = np.arange(50)
+	np.testing.assert_array_equal(lttb(x, x, 50), x)
+	np.testing.assert_array_equal(lttb(x, x, 2), x)
@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta, timezone
+
+from components.fixtures_cache import SealedRoundCache, is_sealed
+
+NOW = datetime(2024, 3, 10, 18, tzinfo=timezone.utc)
+
+
+def fixture(status=None, kickoff=NOW - timedelta(days=1), home_goals=1):
+	data = {"date": kickoff.isoformat(), "goals": {"home": home_goals, "away": 0}}
+	if status is not None:
+		data["status"] = status
+	return {"id": "1", "data": data}
+
+
+def test_is_sealed_by_status():
+	assert is_sealed([fixture("FT"), fixture("AET"), fixture("PEN")], NOW)
+	assert not is_sealed([fixture("FT"), fixture("NS", home_goals=None)], NOW)
+	assert not is_sealed([], NOW)
+
+
+def test_is_sealed_without_status():
+	# Documents loaded before the status was recorded fall back on the score and kickoff time.
+	assert is_sealed([fixture(), fixture(kickoff=NOW - timedelta(hours=3))], NOW)
+	assert not is_sealed([fixture(kickoff=NOW - timedelta(hours=2))], NOW)
+	assert not is_sealed([fixture(home_goals=None)], NOW)
+
+
+def test_sealed_round_cache_round_trip(tmp_path):
+	cache = SealedRoundCache(str(tmp_path))
+	sealed = [fixture("FT")]
+
+	assert cache.put(1, sealed)
+	assert not cache.put(2, [fixture("1H")])
+	assert cache.get(1) == sealed
+	assert cache.get(2) is None
+
+	# A new process reads the sealed round back from disk.
+	assert SealedRoundCache(str(tmp_path)).get(1) == sealed
+	assert SealedRoundCache(str(tmp_path)).get(2) is None
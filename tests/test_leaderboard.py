@@ -0,0 +1,23 @@
+import pandas as pd
+
+from components.leaderboard_section import Leaderboard
+
+
+def test_leaderboard_top_keeps_ties_in_frame_order():
+	teams_df = pd.DataFrame(
+		{
+			"team": ["A", "B", "C", "D", "E", "F"],
+			"win_streak": [3, 5, 3, 1, 5, 3],
+			"average_goals": [1.5, 2.0, 0.5, 2.5, 1.0, 1.5],
+		}
+	)
+	leaderboard = Leaderboard(teams_df, "team")
+
+	top = leaderboard.top("win_streak", 4, "Biggest Win Streak")
+	assert top.columns.tolist() == ["Biggest Win Streak", "Team"]
+	assert top["Team"].tolist() == ["B", "E", "A", "C"]
+	assert top["Biggest Win Streak"].tolist() == [5, 5, 3, 3]
+
+	expected = teams_df.sort_values("average_goals", ascending=False, kind="stable").head(3)
+	assert leaderboard.top("average_goals", 3, "Average Goals")["Team"].tolist() == expected["team"].tolist()
+	assert leaderboard.top("win_streak", 4, "Biggest Win Streak") is top
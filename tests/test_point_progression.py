@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from components.point_progression_section import points_progression
+
+
+def loop_progression(form):
+	# The per-character loop the section used before `points_progression`.
+	points, progression = 0, []
+	for char in form:
+		if char == "W":
+			points += 3
+		elif char == "D":
+			points += 1
+		progression.append(points)
+	return progression
+
+
+def test_points_progression_matches_loop():
+	teams_df = pd.DataFrame({"form": ["WWDLW", "LD", "", None, "DDDDDDW"], "team_id": [1, 2, 3, 4, 5]})
+	progression = points_progression(teams_df)
+
+	assert progression.shape == (7, 5)
+	for form, team_id in zip(teams_df["form"].fillna(""), teams_df["team_id"]):
+		expected = loop_progression(form)
+		column = progression[team_id].to_numpy()
+		np.testing.assert_array_equal(column[: len(expected)], expected)
+		assert np.isnan(column[len(expected) :]).all()
+
+
+def test_points_progression_before_first_round():
+	progression = points_progression(pd.DataFrame({"form": ["", ""], "team_id": [1, 2]}))
+
+	assert progression.empty
+	assert progression.columns.tolist() == [1, 2]
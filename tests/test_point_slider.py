@@ -0,0 +1,21 @@
+import pandas as pd
+
+from components.point_slider_section import points_range, sorted_points
+
+
+def test_sorted_points_keeps_ties_in_standings_order():
+	standings_df = pd.DataFrame({"team": ["A", "B", "C", "D", "E"], "points": [30, 42, 30, 42, 12]})
+	teams, negated_points = sorted_points(standings_df)
+
+	assert teams.tolist() == ["B", "D", "A", "C", "E"]
+	assert (-negated_points).tolist() == [42, 42, 30, 30, 12]
+
+
+def test_points_range_includes_tied_bounds():
+	standings_df = pd.DataFrame({"team": list("ABCDEFG"), "points": [50, 42, 42, 30, 30, 30, 12]})
+	teams, negated_points = sorted_points(standings_df)
+
+	for low, high in [(12, 50), (30, 42), (42, 42), (31, 41), (0, 11), (30, 30), (13, 30)]:
+		selected = teams[points_range(negated_points, low, high)].tolist()
+		expected = standings_df[standings_df["points"].between(low, high)]["team"].tolist()
+		assert selected == expected
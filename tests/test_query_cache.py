@@ -0,0 +1,55 @@
+import os
+
+import pandas as pd
+
+from components.query_cache import QueryCache
+
+
+def frame(value):
+	return pd.DataFrame({"value": [value] * 100})
+
+
+def age(cache, query, version, seconds_ago):
+	path = cache._path(query, version)
+	mtime = os.path.getmtime(path) - seconds_ago
+	os.utime(path, (mtime, mtime))
+
+
+def test_query_cache_normalizes_queries(tmp_path):
+	cache = QueryCache(str(tmp_path), max_bytes=10**6)
+	cache.put("SELECT value\n\tFROM table;", "v1", frame(1))
+
+	assert QueryCache.normalize("  SELECT value   FROM table ; ") == "SELECT value FROM table"
+	pd.testing.assert_frame_equal(cache.get("SELECT value FROM table", "v1"), frame(1))
+	assert cache.get("SELECT value FROM table", "v2") is None
+	assert cache.get("SELECT other FROM table", "v1") is None
+
+
+def test_query_cache_evicts_least_recently_used(tmp_path):
+	cache = QueryCache(str(tmp_path), max_bytes=10**6)
+	cache.put("SELECT 1", None, frame(1))
+	cache.put("SELECT 2", None, frame(2))
+	file_bytes = os.path.getsize(cache._path("SELECT 1", None))
+	age(cache, "SELECT 1", None, 20)
+	age(cache, "SELECT 2", None, 10)
+
+	# Reading the oldest entry makes the other one the least recently used.
+	assert cache.get("SELECT 1", None) is not None
+	cache.max_bytes = int(file_bytes * 2.5)
+	cache.put("SELECT 3", None, frame(3))
+
+	assert cache.get("SELECT 2", None) is None
+	assert cache.get("SELECT 1", None) is not None
+	assert cache.get("SELECT 3", None) is not None
+
+
+def test_query_cache_latest_ignores_version(tmp_path):
+	cache = QueryCache(str(tmp_path), max_bytes=10**6)
+	assert cache.latest("SELECT value FROM table") is None
+
+	cache.put("SELECT value FROM table", "v1", frame(1))
+	age(cache, "SELECT value FROM table", "v1", 10)
+	cache.put("SELECT value FROM table;", "v2", frame(2))
+	cache.put("SELECT other FROM table", "v3", frame(3))
+
+	pd.testing.assert_frame_equal(cache.latest("SELECT value FROM table"), frame(2))
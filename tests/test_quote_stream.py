@@ -0,0 +1,34 @@
+import pytest
+
+pl = pytest.importorskip("polars")
+pytest.importorskip("sqlalchemy")
+
+from etl.postgres.stock import QuoteStream  # noqa: E402
+
+
+def quotes(*rows):
+	return pl.DataFrame(
+		[{"symbol": symbol, "timestamp": timestamp, "price": price} for symbol, timestamp, price in rows],
+		schema={"symbol": pl.Utf8, "timestamp": pl.Int64, "price": pl.Float64},
+	)
+
+
+def test_new_quotes_drops_repeated_quotes():
+	stream = QuoteStream(["MANU", "JUVE.MI"])
+
+	first = stream.new_quotes(quotes(("MANU", 100, 17.1), ("JUVE.MI", 100, 0.3)))
+	assert first.rows() == [("MANU", 100, 17.1), ("JUVE.MI", 100, 0.3)]
+
+	# Only MANU traded since the last poll.
+	second = stream.new_quotes(quotes(("MANU", 115, 17.2), ("JUVE.MI", 100, 0.3)))
+	assert second.rows() == [("MANU", 115, 17.2)]
+	assert second.schema == first.schema
+
+	assert stream.new_quotes(quotes(("MANU", 115, 17.2), ("JUVE.MI", 100, 0.3))).is_empty()
+
+
+def test_new_quotes_skips_quotes_without_symbol_or_timestamp():
+	stream = QuoteStream(["MANU"])
+
+	new = stream.new_quotes(quotes((None, 100, 1.0), ("MANU", None, 17.1), ("MANU", 100, 17.1)))
+	assert new.rows() == [("MANU", 100, 17.1)]
@@ -0,0 +1,37 @@
+from datetime import date, datetime, timezone
+
+from etl.postgres.stock_partitions import day_bounds, partition_day, partition_name, trading_day
+
+
+def test_day_bounds_across_dst():
+	# Clocks spring forward on 2024-03-10 and fall back on 2024-11-03 in New York.
+	for day, hours in [
+		(date(2024, 3, 9), 24),
+		(date(2024, 3, 10), 23),
+		(date(2024, 11, 3), 25),
+		(date(2024, 11, 4), 24),
+	]:
+		start, end = day_bounds(day)
+		assert end - start == hours * 3600
+		assert day_bounds(date.fromordinal(day.toordinal() + 1))[0] == end
+
+
+def test_trading_day_at_partition_bounds():
+	for day in [date(2024, 3, 10), date(2024, 11, 3)]:
+		start, end = day_bounds(day)
+		assert trading_day(start) == day
+		assert trading_day(end - 1) == day
+		assert trading_day(end) != day
+
+
+def test_trading_day_is_new_york_date():
+	# 03:30 UTC on 2024-11-04 is still the evening of 2024-11-03 in New York.
+	timestamp = int(datetime(2024, 11, 4, 3, 30, tzinfo=timezone.utc).timestamp())
+	assert trading_day(timestamp) == date(2024, 11, 3)
+	assert partition_name(trading_day(timestamp)) == "stocks_20241103"
+
+
+def test_partition_day_only_parses_trading_day_partitions():
+	assert partition_day(partition_name(date(2024, 3, 10))) == date(2024, 3, 10)
+	for name in ["stocks_default", "stocks_unpartitioned", "stocks_20241399", "stocks_202403101", "news_20240310"]:
+		assert partition_day(name) is None
@@ -0,0 +1,122 @@
+"""
+Runs the stock table's DDL against a disposable PostgreSQL: TEST_POSTGRES_URI if set, or a local server
+started with `pgserver` if it is installed. Every test rolls back, so the database is left as it was.
+"""
+
+import os
+from datetime import date, datetime
+
+import pytest
+
+pl = pytest.importorskip("polars")
+sqlalchemy = pytest.importorskip("sqlalchemy")
+pytest.importorskip("psycopg2")
+
+from sqlalchemy import text  # noqa: E402
+
+from etl.postgres import stock  # noqa: E402
+from etl.postgres.stock_partitions import NEW_YORK, partition_name  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def engine(tmp_path_factory):
+	uri = os.environ.get("TEST_POSTGRES_URI")
+	if not uri:
+		pgserver = pytest.importorskip("pgserver")
+		server = pgserver.get_server(str(tmp_path_factory.mktemp("postgres")), cleanup_mode="stop")
+		uri = server.get_uri()
+
+	engine = sqlalchemy.create_engine(uri)
+	yield engine
+	engine.dispose()
+
+
+@pytest.fixture
+def connection(engine):
+	with engine.connect() as connection:
+		transaction = connection.begin()
+		yield connection
+		transaction.rollback()
+
+
+def epoch(*args) -> int:
+	return int(datetime(*args, tzinfo=NEW_YORK).timestamp())
+
+
+# Quotes on the day clocks spring forward, and two in the same minute on the next day.
+QUOTES = [
+	("MANU", epoch(2024, 3, 10, 10, 0, 5), 17.1),
+	("MANU", epoch(2024, 3, 11, 10, 0, 5), 17.2),
+	("MANU", epoch(2024, 3, 11, 10, 0, 45), 17.3),
+	("JUVE.MI", epoch(2024, 3, 11, 10, 0, 50), 0.3),
+]
+
+
+def create_legacy_table(connection) -> None:
+	columns = ", ".join(f'"{name}" {type_.replace(" NOT NULL", "")}' for name, type_ in stock.STOCK_COLUMNS.items())
+	connection.execute(text(f'CREATE TABLE "stocks" ({columns})'))
+	for symbol, timestamp, price in QUOTES:
+		connection.execute(
+			text('INSERT INTO "stocks" ("symbol", "timestamp", "price") VALUES (:symbol, :timestamp, :price)'),
+			{"symbol": symbol, "timestamp": timestamp, "price": price},
+		)
+
+
+def published_tables(connection, publication: str):
+	return connection.execute(
+		text(
+			"SELECT tablename, pubviaroot FROM pg_publication_tables "
+			"JOIN pg_publication USING (pubname) WHERE pubname = :publication"
+		),
+		{"publication": publication},
+	).all()
+
+
+def test_create_stock_table_migrates_and_keeps_publication(connection, monkeypatch):
+	monkeypatch.setattr(stock, "STOCK_PUBLICATION", "")
+	create_legacy_table(connection)
+	connection.execute(text('CREATE PUBLICATION "datastream" FOR TABLE "stocks"'))
+
+	assert stock.create_stock_table(connection)
+
+	kind = connection.execute(text("SELECT relkind FROM pg_class WHERE relname = 'stocks'")).scalar()
+	assert kind == "p"
+	assert connection.execute(text("SELECT to_regclass('stocks_unpartitioned')")).scalar() is None
+	assert connection.execute(text('SELECT COUNT(*) FROM "stocks"')).scalar() == len(QUOTES)
+	assert stock.partitions(connection) == {
+		date(2024, 3, 10): partition_name(date(2024, 3, 10)),
+		date(2024, 3, 11): partition_name(date(2024, 3, 11)),
+	}
+	# The partitions' changes are published as changes to `stocks`.
+	assert published_tables(connection, "datastream") == [("stocks", True)]
+
+	assert not stock.create_stock_table(connection)
+
+
+def test_create_stock_table_adds_configured_publication(connection, monkeypatch):
+	monkeypatch.setattr(stock, "STOCK_PUBLICATION", "datastream")
+	connection.execute(text('CREATE PUBLICATION "datastream"'))
+
+	assert not stock.create_stock_table(connection)
+	assert published_tables(connection, "datastream") == [("stocks", True)]
+
+
+def test_maintenance_ignores_other_partitions(connection, monkeypatch):
+	monkeypatch.setattr(stock, "STOCK_PUBLICATION", "")
+	monkeypatch.setattr(stock, "STOCK_COMPACT_AFTER_DAYS", 1)
+	monkeypatch.setattr(stock, "STOCK_RETENTION_DAYS", 1)
+	stock.create_stock_table(connection)
+	connection.execute(text('CREATE TABLE "stocks_default" PARTITION OF "stocks" DEFAULT'))
+	stock.create_partitions(connection, [date(2024, 3, 10), date(2024, 3, 11)])
+	df = pl.DataFrame(QUOTES, schema={"symbol": pl.Utf8, "timestamp": pl.Int64, "price": pl.Float64}, orient="row")
+	stock.copy_quotes(connection, df)
+
+	stock.compact_partitions(connection, date(2024, 3, 12))
+	prices = connection.execute(text('SELECT "symbol", "price" FROM "stocks_20240311" ORDER BY "timestamp"')).all()
+	assert prices == [("MANU", 17.3), ("JUVE.MI", 0.3)]
+	comment = connection.execute(text("SELECT obj_description('stocks_20240311'::regclass, 'pg_class')")).scalar()
+	assert comment == stock.COMPACTED
+
+	stock.apply_retention(connection, date(2024, 3, 12))
+	assert stock.partitions(connection) == {date(2024, 3, 11): partition_name(date(2024, 3, 11))}
+	assert connection.execute(text("SELECT to_regclass('stocks_default')")).scalar() == "stocks_default"